@@ -1,11 +1,20 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+import orjson
 import psycopg2
+from psycopg2 import extensions, pool
+from psycopg2.extras import RealDictCursor
 from pgvector.psycopg2 import register_vector
 import numpy as np
+import subprocess
+import sys
 import threading
+import time
+import random
+from contextlib import contextmanager
+from functools import lru_cache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,6 +26,19 @@ DB_NAME = os.getenv('POSTGRES_DB', 'vectordb')
 DB_USER = os.getenv('POSTGRES_USER', 'postgres')
 DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'postgres')
 
+# Connection pool configuration
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 4))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 32))
+
+# Number of search query embeddings kept in memory
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 4096))
+
+# Seconds to reuse the summaries row count for similarity search pagination
+SUMMARY_COUNT_TTL = int(os.getenv('SUMMARY_COUNT_TTL', 60))
+
+# Seconds to reuse the highest article id when picking a random article
+MAX_ARTICLE_ID_TTL = int(os.getenv('MAX_ARTICLE_ID_TTL', 60))
+
 app = Flask(__name__)
 # Enable CORS for all routes and origins
 CORS(app, resources={r"/*": {"origins": "*"}})
@@ -36,18 +58,259 @@ def get_db_connection():
     register_vector(conn)
     return conn
 
+class PooledConnection(extensions.connection):
+    """Connection that is set up once when the pool opens it"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.autocommit = True
+        register_vector(self)
+        # Names of the PREPARED_STATEMENTS already prepared on this session
+        self.prepared = set()
+
+# Hot queries, prepared once per pooled connection so Postgres skips parse/plan
+PREPARED_STATEMENTS = {
+    'get_news': """
+        SELECT id, source, title, link, pub_date, content, COUNT(*) OVER () AS total
+        FROM news_articles
+        ORDER BY pub_date DESC
+        LIMIT $1 OFFSET $2
+    """,
+    'get_news_by_source': """
+        SELECT id, source, title, link, pub_date, content, COUNT(*) OVER () AS total
+        FROM news_articles
+        WHERE source = $1
+        ORDER BY pub_date DESC
+        LIMIT $2 OFFSET $3
+    """,
+    'get_summaries': """
+        SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
+            COUNT(*) OVER () AS total
+        FROM summaries
+        ORDER BY created_at DESC
+        LIMIT $1 OFFSET $2
+    """,
+    'get_summary': """
+        SELECT id, title, tldr, summary, news_articles_ids, refs, created_at
+        FROM summaries
+        WHERE id = $1
+    """,
+    'get_articles_by_ids': """
+        SELECT id, title, content
+        FROM news_articles
+        WHERE id = ANY($1::int[])
+        ORDER BY id
+    """,
+}
+
+def execute_prepared(cur, name, params):
+    """Execute one of the PREPARED_STATEMENTS, preparing it on first use"""
+    conn = cur.connection
+    if name not in conn.prepared:
+        cur.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]}")
+        conn.prepared.add(name)
+    placeholders = ", ".join(["%s"] * len(params))
+    cur.execute(f"EXECUTE {name} ({placeholders})", params)
+
+# Largest hnsw.ef_search pgvector accepts
+HNSW_EF_SEARCH_MAX = 1000
+
+def execute_vector_search(cur, query, params, k, exact=False):
+    """
+    Run a similarity query ordered by an HNSW-indexed distance and return its
+    rows. An HNSW scan yields at most hnsw.ef_search rows (40 by default), so
+    it is raised to k (LIMIT + OFFSET) for this query only; when k is beyond
+    what ef_search allows, or exact is set, the index is skipped for an exact
+    scan instead. SET LOCAL needs a transaction and pooled connections are
+    autocommit, so the query runs in an explicit one.
+    """
+    cur.execute("BEGIN")
+    try:
+        if exact or k > HNSW_EF_SEARCH_MAX:
+            cur.execute("SET LOCAL enable_indexscan = off")
+        else:
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (max(k, 40),))
+        cur.execute(query, params)
+        rows = cur.fetchall()
+    except Exception:
+        # Never hand a connection back to the pool mid-transaction
+        cur.execute("ROLLBACK")
+        raise
+    cur.execute("COMMIT")
+    return rows
+
+# Per-process connection pool, created lazily so forked workers never share sockets
+_pool = None
+_pool_pid = None
+# Serializes pool creation, so concurrent first requests on gthread workers
+# don't each open a pool of their own
+_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Return the connection pool for the current process, creating it if needed"""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            return _pool
+        db_pool = pool.ThreadedConnectionPool(
+            DB_POOL_MIN,
+            DB_POOL_MAX,
+            host=DB_HOST,
+            port=DB_PORT,
+            dbname=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            connection_factory=PooledConnection,
+            # Rows come back as dicts keyed by column name
+            cursor_factory=RealDictCursor
+        )
+        _pool, _pool_pid = db_pool, os.getpid()
+        return db_pool
+
+@contextmanager
+def db_conn():
+    """Borrow a connection from the pool and give it back when done"""
+    db_pool = get_db_pool()
+    conn = db_pool.getconn()
+    try:
+        yield conn
+    finally:
+        # Drop broken connections instead of handing them to the next request
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+def normalize_query(query):
+    """
+    Collapse runs of whitespace in a search query. The tokenizer splits on
+    whitespace anyway, so this never changes the embedding; case and
+    punctuation are kept since they can ("C++" vs "C#")
+    """
+    return ' '.join(query.split())
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _embed_normalized(model_name, normalized_query):
+    """Embed a normalized query, cached per embedding model"""
+    from data_loader import create_simple_embedding
+    embedding = create_simple_embedding(normalized_query)
+    # The cached array is shared between requests
+    embedding.flags.writeable = False
+    return embedding
+
+def _embed_cached(query):
+    """
+    Get the embedding for a search query as a numpy vector (adapted by
+    register_vector), reusing it for repeated queries
+    """
+    from data_loader import EMBEDDING_MODEL_NAME
+    return _embed_normalized(EMBEDDING_MODEL_NAME, normalize_query(query))
+
+# (expires_at, count) of the last summaries row count
+_summary_count = (0, None)
+
+def get_summary_count(cur):
+    """Total number of summaries, cached briefly since it changes slowly"""
+    global _summary_count
+    expires_at, count = _summary_count
+    now = time.monotonic()
+    if count is None or now >= expires_at:
+        cur.execute("SELECT COUNT(*) AS total FROM summaries")
+        count = cur.fetchone()['total']
+        _summary_count = (now + SUMMARY_COUNT_TTL, count)
+    return count
+
+def page_total(cur, rows, offset, table, where="", params=()):
+    """
+    Pagination total from the COUNT(*) OVER () column of a page query. A page
+    past the last row has no row to carry it, so the total is counted instead.
+    """
+    if rows:
+        return rows[0]['total']
+    if offset <= 0:
+        return 0
+    cur.execute(f"SELECT COUNT(*) AS total FROM {table}{where}", params)
+    return cur.fetchone()['total']
+
+# (expires_at, max_id) of the last news_articles id lookup
+_max_article_id = (0, None)
+
+def get_max_article_id(cur):
+    """Highest news article id, cached briefly for random article picks"""
+    global _max_article_id
+    expires_at, max_id = _max_article_id
+    now = time.monotonic()
+    if max_id is None or now >= expires_at:
+        cur.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM news_articles")
+        max_id = cur.fetchone()['max_id']
+        _max_article_id = (now + MAX_ARTICLE_ID_TTL, max_id)
+    return max_id
+
+def pick_random_unsummarized_article(cur):
+    """
+    Pick a random unsummarized article by seeking to a random id, instead of
+    sorting every unsummarized row by RANDOM()
+    """
+    query = """
+        SELECT id, source, title, content, embedding
+        FROM news_articles
+        WHERE id >= %s AND is_summarized = FALSE
+        ORDER BY id
+        LIMIT 1
+    """
+    max_id = get_max_article_id(cur)
+    cur.execute(query, (random.randint(0, max_id),))
+    row = cur.fetchone()
+    if not row:
+        # Nothing unsummarized past the random id, wrap around to the start
+        cur.execute(query, (0,))
+        row = cur.fetchone()
+    return row
+
+def _json(obj, status=200):
+    """
+    JSON response serialized with orjson, faster than jsonify for large lists.
+    Datetimes are written as ISO-8601 and numpy values are converted natively.
+    """
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+def _summary_row_to_dict(row, has_similarity=False):
+    """
+    Format a summaries row (id, title, tldr, summary, news_articles_ids, refs,
+    created_at[, similarity]) for the API
+    """
+    summary_data = {
+        "id": row['id'],
+        "title": row['title'],
+        "tldr": row['tldr'],
+        "summary": row['summary'],
+        "news_articles_ids": row['news_articles_ids'],
+        # Convert refs array of strings to array of objects
+        "refs": [{"id": i, "sentence": sentence} for i, sentence in enumerate(row['refs'] or (), 1)],
+        "created_at": row['created_at']
+    }
+    if has_similarity:
+        summary_data["similarity"] = row['similarity']
+    return summary_data
+
 @app.route('/healthcheck', methods=['GET'])
 def healthcheck():
     try:
         # Test database connection
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute('SELECT 1')
-        cur.close()
-        conn.close()
-        return jsonify({"status": "ok", "database": "connected"})
+        with db_conn() as conn:
+            cur = conn.cursor()
+            cur.execute('SELECT 1')
+            cur.close()
+        return _json({"status": "ok", "database": "connected"})
     except Exception as e:
-        return jsonify({"status": "ok", "database": "error", "message": str(e)})
+        return _json({"status": "ok", "database": "error", "message": str(e)})
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss statistics for the search query embedding cache"""
+    return _json({"embedding": _embed_normalized.cache_info()._asdict()})
 
 @app.route('/api/news', methods=['GET'])
 def get_news():
@@ -58,63 +321,65 @@ def get_news():
     offset = int(request.args.get('offset', 0))
     
     if ids:
-        ids = ids.split(',')
-        ids = [int(id) for id in ids]
+        ids = list(map(int, ids.split(',')))
     
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with db_conn() as conn:
+            cur = conn.cursor()
         
-        # Construct the query based on parameters
-        query = "SELECT id, source, title, link, pub_date, content FROM news_articles"
-        params = []
+            # Filters, shared by the page query and the fallback count
+            conds = []
+            params = []
         
-        if source:
-            query += " WHERE source = %s"
-            params.append(source)
+            if source:
+                conds.append("source = %s")
+                params.append(source)
         
-        if ids:
-            query += " WHERE id IN %s"
-            params.append(tuple(ids))
-            
-        query += " ORDER BY pub_date DESC LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-        
-        cur.execute(query, params)
-        rows = cur.fetchall()
+            if ids:
+                # One array parameter keeps a single plan shape for any number of ids
+                conds.append("id = ANY(%s)")
+                params.append(ids)
+
+            where = " WHERE " + " AND ".join(conds) if conds else ""
+
+            if ids:
+                # Construct the query based on parameters
+                # COUNT(*) OVER () returns the pagination total with the page itself
+                query = "SELECT id, source, title, link, pub_date, content, COUNT(*) OVER () AS total FROM news_articles"
+                query += where
+                query += " ORDER BY pub_date DESC LIMIT %s OFFSET %s"
+        
+                cur.execute(query, params + [limit, offset])
+            elif source:
+                execute_prepared(cur, 'get_news_by_source', (source, limit, offset))
+            else:
+                execute_prepared(cur, 'get_news', (limit, offset))
+
+            rows = cur.fetchall()
+            total_count = page_total(cur, rows, offset, "news_articles", where, params)
+        
+            # Format results
+            articles = []
+            for row in rows:
+                articles.append({
+                    "id": row['id'],
+                    "source": row['source'],
+                    "title": row['title'],
+                    "link": row['link'],
+                    "pub_date": row['pub_date'],
+                    "content": row['content']
+                })
         
-        # Get total count for pagination
-        count_query = "SELECT COUNT(*) FROM news_articles"
-        if source:
-            count_query += " WHERE source = %s"
-            cur.execute(count_query, [source])
-        else:
-            cur.execute(count_query)
-        total_count = cur.fetchone()[0]
+            cur.close()
         
-        # Format results
-        articles = []
-        for row in rows:
-            articles.append({
-                "id": row[0],
-                "source": row[1],
-                "title": row[2],
-                "link": row[3],
-                "pub_date": row[4].isoformat() if row[4] else None,
-                "content": row[5]
-            })
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify({
+        return _json({
             "total": total_count,
             "offset": offset,
             "limit": limit,
             "articles": articles
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/news/search', methods=['POST'])
 def search_news():
@@ -122,66 +387,51 @@ def search_news():
     search_data = request.get_json()
     
     if not search_data:
-        return jsonify({"error": "Search data is required"}), 400
+        return _json({"error": "Search data is required"}, 400)
         
     query = search_data.get('q', '')
     source = search_data.get('source')
     limit = int(search_data.get('limit', 10))
     
     if not query:
-        return jsonify({"error": "Search query is required"}), 400
+        return _json({"error": "Search query is required"}, 400)
     
     try:
-        from data_loader import create_simple_embedding
-        
         # Create embedding from search query
-        embedding = create_simple_embedding(query)
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Construct the query based on parameters
-        sql_query = """
-            SELECT id, source, title, link, pub_date, content, 
-                   embedding <=> %s::vector as distance
-            FROM news_articles
-        """
-        params = [str(embedding)]  # Convert to string format for pgvector
-        
-        if source:
-            sql_query += " WHERE source = %s"
-            params.append(source)
+        embedding = _embed_cached(query)
+        
+        with db_conn() as conn:
+            cur = conn.cursor()
+        
+            # Construct the query based on parameters, similarity is computed
+            # and the top-k ordered by the vector index in SQL
+            sql_query = """
+                SELECT id, source, title, link, pub_date, content,
+                       1 - (embedding <=> %s::halfvec) AS similarity
+                FROM news_articles
+            """
+            params = [embedding]  # numpy vector, adapted by register_vector
+        
+            if source:
+                sql_query += " WHERE source = %s"
+                params.append(source)
             
-        # sql_query += " ORDER BY distance LIMIT %s"
-        # params.append(limit)
+            sql_query += " ORDER BY embedding <=> %s::halfvec LIMIT %s"
+            params.extend([embedding, limit])
         
-        cur.execute(sql_query, params)
-        rows = cur.fetchall()
+            # The index post-filters by source and would return short pages,
+            # so filtered searches rank the matching rows exactly
+            # Rows already have the API field names
+            articles = execute_vector_search(cur, sql_query, params, limit, exact=bool(source))
         
-        # Format results
-        articles = []
-        for row in rows:
-            articles.append({
-                "id": row[0],
-                "source": row[1],
-                "title": row[2],
-                "link": row[3],
-                "pub_date": row[4].isoformat() if row[4] else None,
-                "content": row[5],
-                "similarity": 1 - row[6]  # Convert distance to similarity
-            })
-        
-        cur.close()
-        conn.close()
-
-        articles = sorted(articles, key=lambda article: article["similarity"], reverse=True)[:limit]
-        
-        return jsonify({
+            cur.close()
+        
+        return _json({
             "query": query,
             "articles": articles
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/summaries', methods=['POST'])
 def create_summary():
@@ -190,12 +440,12 @@ def create_summary():
     data = request.get_json()
     
     if not data:
-        return jsonify({"error": "Request data is required"}), 400
+        return _json({"error": "Request data is required"}, 400)
         
     article_ids = data.get('article_ids', [])
     
     if not article_ids:
-        return jsonify({"error": "Article IDs are required"}), 400
+        return _json({"error": "Article IDs are required"}, 400)
     
     try:
         from summarize import summarize_news_articles
@@ -204,11 +454,11 @@ def create_summary():
         result = summarize_news_articles(article_ids)
         
         if "error" in result:
-            return jsonify({"error": result["error"]}), 400
+            return _json({"error": result["error"]}, 400)
         
-        return jsonify(result)
+        return _json(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/summaries', methods=['GET'])
 def get_summaries():
@@ -219,134 +469,67 @@ def get_summaries():
     offset = int(request.args.get('offset', 0))
     
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Get total count for pagination
-        cur.execute("SELECT COUNT(*) FROM summaries")
-        total_count = cur.fetchone()[0]
+        with db_conn() as conn:
+            cur = conn.cursor()
         
-        if query:
-            # Search by similarity
-            from data_loader import create_simple_embedding
-            
-            # Create embedding from search query
-            embedding = create_simple_embedding(query)
-            
-            # Search by vector similarity
-            # workaround of alias-orderby conflict
-            sql_query = """
-                SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
-                    embedding <=> %s::vector as distance
-                FROM summaries
-            """
+            if query:
+                # Get total count for pagination
+                total_count = get_summary_count(cur)
 
-            #"""
-            #    SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
-            #           embedding <=> %s::vector as distance
-            #    FROM summaries
-            #    ORDER BY distance
-            #    LIMIT %s
-            #"""
-
-            cur.execute(sql_query, (str(embedding), ))
-        else:
-            # Get all summaries
-            sql_query = """
-                SELECT id, title, tldr, summary, news_articles_ids, refs, created_at
-                FROM summaries
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """
-            cur.execute(sql_query, (limit, offset))
-        
-        rows = cur.fetchall()
-        
-        # Format results
-        summaries = []
-        for row in rows:
-            # Convert refs array of strings to array of objects
-            refs_array = []
-            if row[5]:  # Check if refs exists
-                for i, sentence in enumerate(row[5]):
-                    refs_array.append({"id": i+1, "sentence": sentence})
+                # Search by similarity, create embedding from search query
+                embedding = _embed_cached(query)
             
-            summary_data = {
-                "id": row[0],
-                "title": row[1],
-                "tldr": row[2],
-                "summary": row[3],
-                "news_articles_ids": row[4],
-                "refs": refs_array,
-                "created_at": row[6].isoformat() if row[6] else None
-            }
-            
-            # Add similarity if search query was provided
-            if query and len(row) > 7:
-                summary_data["similarity"] = 1 - row[7]  # Convert distance to similarity
-                
-            summaries.append(summary_data)
+                # Search by vector similarity, ordering by the distance expression
+                # itself (not its alias) so the vector index can serve the top-k
+                sql_query = """
+                    SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
+                        1 - (embedding <=> %s::halfvec) AS similarity
+                    FROM summaries
+                    ORDER BY embedding <=> %s::halfvec
+                    LIMIT %s OFFSET %s
+                """
+                rows = execute_vector_search(
+                    cur, sql_query, (embedding, embedding, limit, offset), limit + offset
+                )
+            else:
+                # Get all summaries, with the pagination total on every row
+                execute_prepared(cur, 'get_summaries', (limit, offset))
+                rows = cur.fetchall()
+                total_count = page_total(cur, rows, offset, "summaries")
         
-        cur.close()
-        conn.close()
+            cur.close()
 
-        # workaround of alias-orderby conflict
-        if query:
-            summaries = sorted(summaries, key=lambda summary: summary["similarity"], reverse=True)[offset:limit]
-        
-        return jsonify({
+        # Format results, with similarity if search query was provided
+        summaries = [_summary_row_to_dict(row, has_similarity=bool(query)) for row in rows]
+
+        return _json({
             "total": total_count,
             "offset": offset,
             "limit": limit,
             "summaries": summaries
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/summaries/<int:summary_id>', methods=['GET'])
 def get_summary(summary_id):
     """Get a specific summary by ID"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with db_conn() as conn:
+            cur = conn.cursor()
         
-        # Get the summary
-        cur.execute("""
-            SELECT id, title, tldr, summary, news_articles_ids, refs, created_at
-            FROM summaries
-            WHERE id = %s
-        """, (summary_id,))
+            # Get the summary
+            execute_prepared(cur, 'get_summary', (summary_id,))
         
-        row = cur.fetchone()
+            row = cur.fetchone()
+            cur.close()
         
         if not row:
-            cur.close()
-            conn.close()
-            return jsonify({"error": "Summary not found"}), 404
+            return _json({"error": "Summary not found"}, 404)
         
-        # Convert refs array of strings to array of objects
-        refs_array = []
-        if row[5]:  # Check if refs exists
-            for i, sentence in enumerate(row[5]):
-                refs_array.append({"id": i+1, "sentence": sentence})
-        
-        # Format result
-        summary_data = {
-            "id": row[0],
-            "title": row[1],
-            "tldr": row[2],
-            "summary": row[3],
-            "news_articles_ids": row[4],
-            "refs": refs_array,
-            "created_at": row[6].isoformat() if row[6] else None
-        }
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify(summary_data)
+        return _json(_summary_row_to_dict(row))
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/summaries/search', methods=['POST'])
 def search_summary():
@@ -355,143 +538,106 @@ def search_summary():
     search_data = request.get_json()
     
     if not search_data:
-        return jsonify({"error": "Search data is required"}), 400
+        return _json({"error": "Search data is required"}, 400)
         
     query = search_data.get('q', '')
     limit = int(search_data.get('limit', 10))
     
     if not query:
-        return jsonify({"error": "Search query is required"}), 400
+        return _json({"error": "Search query is required"}, 400)
     
     try:
-        from data_loader import create_simple_embedding
-        
         # Create embedding from search query
-        embedding = create_simple_embedding(query)
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Search by vector similarity
-        # workaround of alias-orderby conflict
-        sql_query = """
-            SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
-                   embedding <=> %s::vector as distance
-            FROM summaries
-        """
-
-        #"""
-        #    SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
-        #           embedding <=> %s::vector as distance
-        #    FROM summaries
-        #    ORDER BY distance
-        #    LIMIT %s
-        #"""
-
-        cur.execute(sql_query, (str(embedding), ))
-        rows = cur.fetchall()
+        embedding = _embed_cached(query)
+        
+        with db_conn() as conn:
+            cur = conn.cursor()
+        
+            # Search by vector similarity, ordering by the distance expression
+            # itself (not its alias) so the vector index can serve the top-k
+            sql_query = """
+                SELECT id, title, tldr, summary, news_articles_ids, refs, created_at,
+                       1 - (embedding <=> %s::halfvec) AS similarity
+                FROM summaries
+                ORDER BY embedding <=> %s::halfvec
+                LIMIT %s
+            """
+            rows = execute_vector_search(cur, sql_query, (embedding, embedding, limit), limit)
+            cur.close()
         
         # Format results
-        summaries = []
-        for row in rows:
-            # Convert refs array of strings to array of objects
-            refs_array = []
-            if row[5]:  # Check if refs exists
-                for i, sentence in enumerate(row[5]):
-                    refs_array.append({"id": i+1, "sentence": sentence})
-            
-            summaries.append({
-                "id": row[0],
-                "title": row[1],
-                "tldr": row[2],
-                "summary": row[3],
-                "news_articles_ids": row[4],
-                "refs": refs_array,
-                "created_at": row[6].isoformat() if row[6] else None,
-                "similarity": 1 - row[7]  # Convert distance to similarity
-            })
-        
-        cur.close()
-        conn.close()
-        
-        # workaround of alias-orderby conflict
-        summaries = sorted(summaries, key=lambda summary: summary["similarity"], reverse=True)[:limit]
-
-        return jsonify({
+        summaries = [_summary_row_to_dict(row, has_similarity=True) for row in rows]
+        
+        return _json({
             "query": query,
             "summaries": summaries
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 @app.route('/api/random-summary', methods=['POST'])
 def create_random_summary():
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Get a random article that hasn't been summarized yet
-        cur.execute("""
-            SELECT id, source, title, content, embedding
-            FROM news_articles
-            WHERE is_summarized = FALSE
-            ORDER BY RANDOM()
-            LIMIT 1
-        """)
-        
-        random_article = cur.fetchone()
-        if not random_article:
-            return jsonify({"error": "No unsummarized articles found"}), 404
+        with db_conn() as conn:
+            cur = conn.cursor()
+        
+            # Get a random article that hasn't been summarized yet
+            random_article = pick_random_unsummarized_article(cur)
+            if not random_article:
+                return _json({"error": "No unsummarized articles found"}, 404)
             
-        random_article_id = random_article[0]
-        random_article_source = random_article[1]
-        random_article_embedding = random_article[4]
-        
-        # Find 5 closest articles from different sources
-        cur.execute("""
-            SELECT id, source, title, content
-            FROM news_articles
-            WHERE is_summarized = FALSE
-            AND source != %s
-            ORDER BY embedding <=> %s::vector
-            LIMIT 5
-        """, (random_article_source, random_article_embedding))
-
-        related_articles = cur.fetchall()
-        if len(related_articles) < 2:
-            return jsonify({"error": "Not enough related articles found from different sources"}), 404
+            random_article_id = random_article['id']
+            random_article_source = random_article['source']
+            random_article_embedding = random_article['embedding']
+        
+            # Find 5 closest articles from different sources
+            cur.execute("""
+                SELECT id, source, title, content
+                FROM news_articles
+                WHERE is_summarized = FALSE
+                AND source != %s
+                ORDER BY embedding <=> %s::halfvec
+                LIMIT 5
+            """, (random_article_source, random_article_embedding))
+
+            related_articles = cur.fetchall()
+            if len(related_articles) < 2:
+                return _json({"error": "Not enough related articles found from different sources"}, 404)
             
-        # Combine all articles for summarization
-        article_ids = [random_article_id]
-        source_set = set()
+            # Combine all articles for summarization
+            article_ids = [random_article_id]
+            source_set = set()
 
-        for article in related_articles:
-            if article[1] not in source_set:
-                article_ids.append(article[0])
-                source_set.add(article[1])
+            for article in related_articles:
+                if article['source'] not in source_set:
+                    article_ids.append(article['id'])
+                    source_set.add(article['source'])
+
+            cur.close()
         
-        # Generate summary
+        # Generate summary (outside the pooled connection, this can take a while)
         from summarize import summarize_news_articles
         result = summarize_news_articles(article_ids)
         
         if "error" in result:
-            return jsonify({"error": result["error"]}), 500
+            return _json({"error": result["error"]}, 500)
             
         # Mark articles as summarized
-        cur.execute("""
-            UPDATE news_articles
-            SET is_summarized = TRUE
-            WHERE id = ANY(%s)
-        """, (article_ids,))
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                UPDATE news_articles
+                SET is_summarized = TRUE
+                WHERE id = ANY(%s)
+            """, (article_ids,))
+        
+            conn.commit()
+            cur.close()
         
-        return jsonify(result)
+        return _json(result)
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 def load_data_async():
     """Load data asynchronously on startup"""
@@ -501,9 +647,22 @@ def load_data_async():
     except Exception as e:
         print(f"Error loading data: {str(e)}")
 
+def start_data_loader():
+    """
+    Load data in a separate process, so CSV parsing and embedding run under
+    their own GIL instead of competing with request handling. It is a plain
+    subprocess, not a multiprocessing child: gunicorn starts it in the master,
+    and workers forked afterwards would inherit a multiprocessing child and
+    fail to join it at exit.
+    """
+    return subprocess.Popen(
+        [sys.executable, '-c', 'from app import load_data_async; load_data_async()'],
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+
 if __name__ == '__main__':
-    # Start data loading in a background thread
-    threading.Thread(target=load_data_async).start()
+    # Start data loading in a background process
+    start_data_loader()
     
     port = int(os.getenv('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
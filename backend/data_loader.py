@@ -1,6 +1,7 @@
 import os
 import csv
 import psycopg2
+from psycopg2.extras import execute_values
 from pgvector.psycopg2 import register_vector
 import numpy as np
 from datetime import datetime
@@ -8,6 +9,42 @@ import pandas as pd
 from app import get_db_connection
 import time
 import json
+import hashlib
+import shelve
+from contextlib import contextmanager
+
+# Embedding model, also used to key cached embeddings
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# Column holding the article body in each source's CSV
+CONTENT_COLUMNS = {
+    'HKFP': 'full_content',
+    'RTHK': 'full_content',
+    'SCMP': 'full_paragraphs'
+}
+
+# Rows read from a CSV at a time, bounding memory during import
+CSV_CHUNK_SIZE = int(os.getenv('CSV_CHUNK_SIZE', 2000))
+
+# On-disk cache of model embeddings keyed by content hash, reused across imports
+EMBEDDING_CACHE_PATH = os.getenv(
+    'EMBEDDING_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'emb_cache')
+)
+
+# Tokens the encoder reads per text; anything longer is truncated by the model
+EMBEDDING_MAX_SEQ_LENGTH = 256
+
+# Characters kept per text before tokenizing. Comfortably more than
+# EMBEDDING_MAX_SEQ_LENGTH tokens of English, so embeddings are unchanged, but
+# long articles no longer get tokenized in full only to be cut off
+EMBEDDING_MAX_CHARS = EMBEDDING_MAX_SEQ_LENGTH * 8
+
+# maintenance_work_mem used while rebuilding the HNSW indexes after a bulk load
+INDEX_BUILD_MEMORY = os.getenv('INDEX_BUILD_MEMORY', '1GB')
+
+# Intra-op threads torch uses for encoding
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', os.cpu_count() or 1))
 
 # Global model variable to avoid reloading for each embedding
 _model = None
@@ -19,62 +56,188 @@ def get_embedding_model():
     global _model
     if _model is None:
         try:
+            import torch
             from sentence_transformers import SentenceTransformer
+            # Spread the encoder's matmuls across the available cores
+            torch.set_num_threads(EMBEDDING_THREADS)
+            try:
+                torch.set_num_interop_threads(2)
+            except RuntimeError:
+                # Can only be set before torch starts any parallel work
+                pass
             print("Loading sentence transformer model...")
             # Use a smaller, faster model for demo purposes
-            _model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')  # 384 dimensions
-            print("Model loaded successfully")
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            _model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)  # 384 dimensions
+            _model.max_seq_length = EMBEDDING_MAX_SEQ_LENGTH
+            _model.eval()
+            print(f"Model loaded successfully on {device} ({EMBEDDING_THREADS} threads)")
         except ImportError:
             print("WARNING: sentence-transformers not available, falling back to simple embeddings")
             _model = None
     return _model
 
+def _prepare_text(text, max_chars=EMBEDDING_MAX_CHARS):
+    """Clean and truncate text before embedding (models have input limits)"""
+    if not text or not isinstance(text, str):
+        return "No content available"
+    return text[:max_chars]
+
+def _fallback_embedding(text, vector_size=384):
+    """Deterministic random unit vector used when the model is unavailable"""
+    # hash() is salted per interpreter, blake2b gives the same seed on every run
+    seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+    rng = np.random.default_rng(seed)
+    embedding = rng.random(vector_size, dtype=np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+def _embedding_key(text):
+    """Cache key for a prepared text under the current model"""
+    return hashlib.sha256((EMBEDDING_MODEL_NAME + '\0' + text).encode('utf-8')).hexdigest()
+
+def _open_embedding_cache():
+    """
+    Open the embedding disk cache, or return None if it cannot be used (a dbm
+    lock held by another loader process, an unwritable or corrupt file)
+    """
+    try:
+        return shelve.open(EMBEDDING_CACHE_PATH)
+    except Exception as e:
+        print(f"Embedding cache unavailable ({str(e)}), encoding without it")
+        return None
+
+def _encode_cached(model, texts, batch_size):
+    """
+    Encode texts with the model, reusing embeddings stored in the disk cache.
+    Only texts missing from the cache are sent to the model, once each. Cache
+    errors only cost the reuse, the texts are still encoded by the model.
+    """
+    keys = [_embedding_key(text) for text in texts]
+    cache = _open_embedding_cache()
+    found = {}
+    try:
+        if cache is not None:
+            try:
+                found = {key: cache[key] for key in set(keys) if key in cache}
+            except Exception as e:
+                print(f"Error reading embedding cache: {str(e)}, encoding without it")
+                found = {}
+        misses = {key: text for key, text in zip(keys, texts) if key not in found}
+        
+        if misses:
+            print(f"Embedding {len(misses)} texts ({len(found)} cached)...")
+            encoded = model.encode(list(misses.values()), batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+            found.update(zip(misses, encoded))
+            if cache is not None:
+                try:
+                    for key in misses:
+                        cache[key] = found[key]
+                except Exception as e:
+                    print(f"Error writing embedding cache: {str(e)}")
+    finally:
+        if cache is not None:
+            try:
+                cache.close()
+            except Exception as e:
+                print(f"Error closing embedding cache: {str(e)}")
+    
+    return [found[key] for key in keys]
+
+def create_embeddings(texts, vector_size=384, batch_size=64):
+    """
+    Creates embeddings for a list of texts in batches, returning numpy vectors
+    in the same order. Falls back to simple random embeddings if the model is not available.
+    """
+    texts = [_prepare_text(text) for text in texts]
+    if not texts:
+        return []
+    
+    model = get_embedding_model()
+    
+    if model:
+        try:
+            # One encode call lets the model batch the forward passes
+            return _encode_cached(model, texts, batch_size)
+        except Exception as e:
+            print(f"Error generating embeddings: {str(e)}, falling back to simple embeddings")
+    
+    print("Using fallback random embeddings")
+    return [_fallback_embedding(text, vector_size) for text in texts]
+
 def create_simple_embedding(text, vector_size=384):
     """
     Creates an embedding for text using a pre-trained model.
     Falls back to simple random embedding if model is not available.
     """
-    # Clean and truncate the text (models have input limits)
-    if not text or not isinstance(text, str):
-        text = "No content available"
-    
-    # Truncate long texts (most models have a token limit)
-    max_chars = 10000
-    if len(text) > max_chars:
-        text = text[:max_chars]
+    text = _prepare_text(text)
     
     model = get_embedding_model()
     
     if model:
         try:
             # Get embedding from the model
-            embedding = model.encode(text)
-            # Format for pgvector: "[x1,x2,x3,...]"
-            return "[" + ",".join(str(x) for x in embedding.tolist()) + "]"
+            return model.encode(text, convert_to_numpy=True)
         except Exception as e:
             print(f"Error generating embedding: {str(e)}, falling back to simple embedding")
             # Fall back to simple embedding if model fails
     
     # Simple fallback embedding
     print("Using fallback random embedding")
-    np.random.seed(hash(text) % 2**32)
-    embedding = np.random.rand(vector_size).astype(np.float32)
-    embedding = embedding / np.linalg.norm(embedding)
-    return "[" + ",".join(str(x) for x in embedding.tolist()) + "]"
+    return _fallback_embedding(text, vector_size)
 
-def check_data_exists():
-    """Check if there's already data in the news_articles table"""
+@contextmanager
+def _connection(conn=None):
+    """Use the given connection, or open one for the duration of the block"""
+    if conn is not None:
+        yield conn
+        return
     conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM news_articles")
-    count = cur.fetchone()[0]
-    cur.close()
-    conn.close()
-    return count > 0
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def _without_embedding_index(cur, table):
+    """
+    Drop the table's HNSW embedding index for a bulk load and rebuild it once
+    afterwards, which is far faster than maintaining it on every insert
+    """
+    index = f"{table}_embedding_idx"
+    cur.execute(f"DROP INDEX IF EXISTS {index}")
+    try:
+        yield
+    finally:
+        print(f"Rebuilding {index}...")
+        cur.execute("SET maintenance_work_mem = %s", (INDEX_BUILD_MEMORY,))
+        cur.execute("SET max_parallel_maintenance_workers = 4")
+        cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS {index} ON {table}
+            USING hnsw (embedding halfvec_cosine_ops)
+        """)
+        cur.execute("RESET maintenance_work_mem")
+        cur.execute("RESET max_parallel_maintenance_workers")
+
+def check_data_exists(cur):
+    """Check if there's already data in the news_articles table"""
+    # EXISTS stops at the first row instead of counting the whole table
+    cur.execute("SELECT EXISTS (SELECT 1 FROM news_articles)")
+    return cur.fetchone()[0]
+
+def load_csv_data(conn=None):
+    """
+    Load all CSV files if no data exists in the database. Pass conn to reuse an
+    open connection, otherwise one is opened for the import
+    """
+    with _connection(conn) as conn:
+        cur = conn.cursor()
+        try:
+            _load_csv_data(cur)
+        finally:
+            cur.close()
 
-def load_csv_data():
-    """Load all CSV files if no data exists in the database"""
-    if check_data_exists():
+def _load_csv_data(cur):
+    if check_data_exists(cur):
         print("Data already exists in the database. Skipping import.")
         return
     
@@ -95,18 +258,14 @@ def load_csv_data():
         if not os.path.exists(file_path):
             print(f"WARNING: File not found: {file_path}")
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
     total_imported = 0
     
-    for source, file_path in csv_files.items():
-        imported = import_csv_file(source, file_path, cur)
-        total_imported += imported
-        
-    conn.commit()
-    cur.close()
-    conn.close()
+    with _without_embedding_index(cur, 'news_articles'):
+        for source, file_path in csv_files.items():
+            imported = import_csv_file(source, file_path, cur)
+            total_imported += imported
+    
+    cur.connection.commit()
     
     print(f"Import complete. Total records imported: {total_imported}")
 
@@ -118,90 +277,135 @@ def import_csv_file(source_name, file_path, cursor):
         print(f"File not found: {file_path}")
         return 0
     
-    # Read CSV with pandas to handle any potential encoding issues
-    df = pd.read_csv(file_path)
+    # Only read the columns we store, streaming the file in chunks
+    content_col = CONTENT_COLUMNS.get(source_name)
+    wanted = {'title', 'link', 'pub_date_formatted', content_col}
+    reader = pd.read_csv(file_path, chunksize=CSV_CHUNK_SIZE, usecols=lambda col: col in wanted)
     
     imported_count = 0
-    for _, row in df.iterrows():
+    for chunk in reader:
+        imported_count += import_csv_chunk(source_name, chunk, content_col, cursor)
+        print(f"Imported {imported_count} records from {source_name}...")
+    
+    print(f"Completed import of {imported_count} records from {source_name}")
+    return imported_count
+
+def parse_pub_dates(chunk, source_name):
+    """
+    Parse pub_date_formatted for a whole chunk at once. Accepts datetimes and
+    plain dates, falling back to the current time for anything else.
+    """
+    now = datetime.now()
+    if 'pub_date_formatted' not in chunk.columns:
+        print(f"Missing pub_date_formatted for {source_name} articles, using current date")
+        return [now] * len(chunk)
+    
+    date_strs = chunk['pub_date_formatted'].astype('string').str.strip()
+    dates = pd.to_datetime(date_strs, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    missing = dates.isna()
+    if missing.any():
+        dates.loc[missing] = pd.to_datetime(date_strs[missing], format='%Y-%m-%d', errors='coerce')
+    
+    unparsed = dates.isna() & date_strs.fillna('').ne('')
+    if unparsed.any():
+        print(f"Converting {unparsed.sum()} non-standard dates from {source_name} to current date")
+    
+    return dates.fillna(pd.Timestamp(now)).tolist()
+
+# Rows per multi-row INSERT statement
+INSERT_PAGE_SIZE = 500
+
+# Article insert for execute_values; RETURNING counts the rows actually
+# inserted, since links already present are skipped by ON CONFLICT
+INSERT_ARTICLES_SQL = """
+    INSERT INTO news_articles (source, title, link, pub_date, content, embedding, is_summarized)
+    VALUES %s
+    ON CONFLICT (link) DO NOTHING
+    RETURNING id
+"""
+INSERT_ARTICLES_TEMPLATE = "(%s, %s, %s, %s, %s, %s, FALSE)"
+
+def import_csv_chunk(source_name, chunk, content_col, cursor):
+    """Embed and insert one chunk of a CSV file, returning the number of rows inserted"""
+    # Skip links that are already imported before spending any embedding work on them
+    links = chunk['link'].dropna().astype(str).unique().tolist()
+    cursor.execute("SELECT link FROM news_articles WHERE link = ANY(%s)", (links,))
+    existing = {row[0] for row in cursor.fetchall()}
+    if existing:
+        chunk = chunk[~chunk['link'].isin(existing)]
+        print(f"Skipping {len(existing)} {source_name} articles already in the database")
+    if chunk.empty:
+        return 0
+    
+    pub_dates = parse_pub_dates(chunk, source_name)
+    
+    # Collect rows first so all contents can be embedded in one batch
+    records = []
+    for row, pub_date in zip(chunk.itertuples(index=False), pub_dates):
         try:
             # Get the appropriate content field based on the source
-            if source_name == 'HKFP':
-                content = row['full_content']
-            elif source_name == 'RTHK':
-                content = row['full_content']
-            elif source_name == 'SCMP':
-                content = row['full_paragraphs']
-            else:
-                content = "No content available"
-            
-            # Parse date using pub_date_formatted which should be consistently formatted
-            try:
-                # If pub_date_formatted exists and has time component
-                if 'pub_date_formatted' in row and ':' in str(row['pub_date_formatted']):
-                    pub_date = datetime.strptime(row['pub_date_formatted'], '%Y-%m-%d %H:%M:%S')
-                # If pub_date_formatted exists but is just a date
-                elif 'pub_date_formatted' in row:
-                    date_str = str(row['pub_date_formatted']).strip()
-                    if date_str:
-                        try:
-                            pub_date = datetime.strptime(date_str, '%Y-%m-%d')
-                        except ValueError:
-                            # For any other format, just extract year-month-day
-                            print(f"Converting non-standard date: {date_str}")
-                            pub_date = datetime.now()
-                    else:
-                        pub_date = datetime.now()
-                else:
-                    # Fallback to current date if formatted date isn't available
-                    pub_date = datetime.now()
-                    print(f"Missing pub_date_formatted for {source_name} article: {row['title'][:30]}...")
-            except Exception as e:
-                print(f"Date parsing error ({source_name}): {e}, using current date")
-                pub_date = datetime.now()  # Use current date as fallback
+            content = getattr(row, content_col) if content_col else "No content available"
             
-            # Create embedding
-            embedding = create_simple_embedding(content)
+            # Empty CSV cells come back as NaN, which the NOT NULL text columns reject
+            if not all(isinstance(value, str) for value in (row.title, row.link, content)):
+                print(f"Skipping {source_name} record with missing title, link or content: {row.link}")
+                continue
             
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO news_articles (source, title, link, pub_date, content, embedding, is_summarized)
-                VALUES (%s, %s, %s, %s, %s, %s::vector, FALSE)
-                ON CONFLICT (link) DO NOTHING
-            """, (
-                source_name, 
-                row['title'], 
-                row['link'], 
-                pub_date, 
-                content, 
-                embedding
-            ))
-            
-            imported_count += 1
-            
-            # Print progress every 100 records
-            if imported_count % 100 == 0:
-                print(f"Imported {imported_count} records from {source_name}...")
-                
+            records.append((row.title, row.link, pub_date, content))
         except Exception as e:
-            print(f"Error importing record from {source_name}: {str(e)}")
+            print(f"Error reading record from {source_name}: {str(e)}")
             continue
     
-    print(f"Completed import of {imported_count} records from {source_name}")
-    return imported_count
+    embeddings = create_embeddings([content for _, _, _, content in records])
+    
+    rows = [
+        (source_name, title, link, pub_date, content, embedding)
+        for (title, link, pub_date, content), embedding in zip(records, embeddings)
+    ]
+    
+    # Insert in pages of INSERT_PAGE_SIZE rows per statement instead of one
+    # round-trip per row. The connection is autocommit, so each page is atomic:
+    # a page that fails inserts nothing and is retried row by row, skipping
+    # only the bad rows
+    inserted = 0
+    for start in range(0, len(rows), INSERT_PAGE_SIZE):
+        page = rows[start:start + INSERT_PAGE_SIZE]
+        try:
+            inserted += len(execute_values(
+                cursor, INSERT_ARTICLES_SQL, page,
+                template=INSERT_ARTICLES_TEMPLATE, page_size=len(page), fetch=True
+            ))
+        except Exception as e:
+            print(f"Error importing {len(page)} records from {source_name}: {str(e)}, retrying one by one")
+            for row in page:
+                try:
+                    inserted += len(execute_values(
+                        cursor, INSERT_ARTICLES_SQL, [row],
+                        template=INSERT_ARTICLES_TEMPLATE, fetch=True
+                    ))
+                except Exception as e:
+                    print(f"Error importing record from {source_name}: {str(e)}")
+    return inserted
 
-def check_summaries_exist():
+def check_summaries_exist(cur):
     """Check if there's already data in the summaries table"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM summaries")
-    count = cur.fetchone()[0]
-    cur.close()
-    conn.close()
-    return count > 0
+    cur.execute("SELECT EXISTS (SELECT 1 FROM summaries)")
+    return cur.fetchone()[0]
 
-def load_summaries_json():
-    """Load summaries from JSON file if no data exists in the summaries table"""
-    if check_summaries_exist():
+def load_summaries_json(conn=None):
+    """
+    Load summaries from JSON file if no data exists in the summaries table. Pass
+    conn to reuse an open connection, otherwise one is opened for the import
+    """
+    with _connection(conn) as conn:
+        cur = conn.cursor()
+        try:
+            _load_summaries_json(cur)
+        finally:
+            cur.close()
+
+def _load_summaries_json(cur):
+    if check_summaries_exist(cur):
         print("Summaries already exist in the database. Skipping import.")
         return
     
@@ -223,12 +427,12 @@ def load_summaries_json():
         print(f"Error reading summaries JSON file: {str(e)}")
         return
     
-    conn = get_db_connection()
-    cur = conn.cursor()
+    # Embed every summary text in one batch
+    embeddings = create_embeddings([summary.get('summary', 'No summary') for summary in summaries])
     
-    imported_count = 0
+    rows = []
     
-    for summary in summaries:
+    for summary, embedding in zip(summaries, embeddings):
         try:
             title = summary.get('title', 'No title')
             tldr = summary.get('tldr', [])
@@ -245,14 +449,7 @@ def load_summaries_json():
                 else:
                     refs_list.append(str(ref))
             
-            # Create embedding from summary text
-            embedding = create_simple_embedding(summary_text)
-            
-            # Insert into database
-            cur.execute("""
-                INSERT INTO summaries (title, tldr, summary, news_articles_ids, refs, embedding)
-                VALUES (%s, %s, %s, %s, %s, %s::vector)
-            """, (
+            rows.append((
                 title,
                 tldr,
                 summary_text,
@@ -261,19 +458,28 @@ def load_summaries_json():
                 embedding
             ))
             
-            imported_count += 1
-            
         except Exception as e:
             print(f"Error importing summary: {str(e)}")
             continue
     
-    conn.commit()
-    cur.close()
-    conn.close()
+    # Insert all summaries in batched statements
+    with _without_embedding_index(cur, 'summaries'):
+        try:
+            execute_values(cur, """
+                INSERT INTO summaries (title, tldr, summary, news_articles_ids, refs, embedding)
+                VALUES %s
+            """, rows, template="(%s, %s, %s, %s, %s, %s)", page_size=500)
+            imported_count = len(rows)
+        except Exception as e:
+            print(f"Error importing summaries: {str(e)}")
+            imported_count = 0
+    
+    cur.connection.commit()
     
     print(f"Import complete. Total summaries imported: {imported_count}")
 
 if __name__ == "__main__":
-    # Can be run directly to load data
-    load_csv_data()
-    load_summaries_json() 
\ No newline at end of file
+    # Can be run directly to load data, sharing one connection
+    with _connection() as conn:
+        load_csv_data(conn)
+        load_summaries_json(conn) 
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+
+# Bind to the same port the Flask dev server used
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# Handlers are I/O-bound (Postgres, OpenAI), so threads give concurrency per worker
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('WEB_THREADS', 8))
+
+# Summary generation waits on OpenAI, allow it to finish
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+
+def when_ready(server):
+    """Load data once from the master instead of once per worker"""
+    from app import start_data_loader
+    start_data_loader()
@@ -1,33 +1,9 @@
 import os
+from app import get_db_connection
 from data_loader import load_csv_data, load_summaries_json
-import psycopg2
-from pgvector.psycopg2 import register_vector
 
-def get_db_connection():
-    """Connect to the PostgreSQL database server"""
-    DB_HOST = os.getenv('POSTGRES_HOST', 'postgres')
-    DB_PORT = os.getenv('POSTGRES_PORT', '5432')
-    DB_NAME = os.getenv('POSTGRES_DB', 'vectordb')
-    DB_USER = os.getenv('POSTGRES_USER', 'postgres')
-    DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', 'postgres')
-    
-    conn = psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD
-    )
-    # Enable autocommit to avoid transaction issues
-    conn.autocommit = True
-    # Register the vector type with psycopg2
-    register_vector(conn)
-    return conn
-
-def check_table_exists():
+def check_table_exists(cur):
     """Check if the news_articles table exists"""
-    conn = get_db_connection()
-    cur = conn.cursor()
     cur.execute("""
         SELECT EXISTS (
             SELECT FROM information_schema.tables 
@@ -35,8 +11,6 @@ def check_table_exists():
         )
     """)
     exists = cur.fetchone()[0]
-    cur.close()
-    conn.close()
     return exists
 
 def list_csv_files():
@@ -60,8 +34,12 @@ def list_csv_files():
 if __name__ == "__main__":
     print("Starting data load script...")
     
+    # One connection serves every step of the load
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
     # Check if table exists
-    if check_table_exists():
+    if check_table_exists(cur):
         print("Table 'news_articles' exists in the database.")
     else:
         print("ERROR: Table 'news_articles' does not exist in the database!")
@@ -75,7 +53,7 @@ if __name__ == "__main__":
     # Try to load data
     print("Attempting to load news article data...")
     try:
-        load_csv_data()
+        load_csv_data(conn)
         print("News article data loading completed.")
     except Exception as e:
         print(f"Error loading news article data: {str(e)}")
@@ -83,21 +61,23 @@ if __name__ == "__main__":
     # Try to load summaries
     print("Attempting to load summaries data...")
     try:
-        load_summaries_json()
+        load_summaries_json(conn)
         print("Summaries data loading completed.")
     except Exception as e:
         print(f"Error loading summaries data: {str(e)}")
     
-    # Check if data was loaded
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM news_articles")
-    articles_count = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM summaries")
-    summaries_count = cur.fetchone()[0]
+    # Check if data was loaded. ANALYZE refreshes planner statistics after the
+    # bulk load, and the row estimates it records avoid counting every row
+    cur.execute("ANALYZE news_articles, summaries")
+    cur.execute("""
+        SELECT relname, GREATEST(reltuples, 0)::bigint
+        FROM pg_class
+        WHERE relname IN ('news_articles', 'summaries') AND relkind = 'r'
+    """)
+    row_estimates = dict(cur.fetchall())
     cur.close()
     conn.close()
     
-    print(f"Number of news articles in the database: {articles_count}")
-    print(f"Number of summaries in the database: {summaries_count}")
+    print(f"Number of news articles in the database: ~{row_estimates.get('news_articles', 0)}")
+    print(f"Number of summaries in the database: ~{row_estimates.get('summaries', 0)}")
     print("Data loading process completed.") 
\ No newline at end of file
@@ -1,11 +1,13 @@
 import os
 import json
-from openai import OpenAI
+import asyncio
+import orjson
+from openai import AsyncOpenAI, OpenAI
 import httpx
 from dotenv import load_dotenv
 import psycopg2
 from pgvector.psycopg2 import register_vector
-from app import get_db_connection
+from app import db_conn, execute_prepared
 from data_loader import create_simple_embedding
 
 # Load environment variables
@@ -18,33 +20,20 @@ class CustomHTTPClient(httpx.Client):
         kwargs.pop('proxies', None)  
         super().__init__(*args, **kwargs)
 
+class CustomAsyncHTTPClient(httpx.AsyncClient):
+    def __init__(self, *args, **kwargs):
+        # Remove 'proxies' argument if present
+        kwargs.pop('proxies', None)
+        super().__init__(*args, **kwargs)
+
 # Initialize OpenAI client with custom HTTP client
 client = OpenAI(
     api_key=os.getenv('OPENAI_API_KEY'),
     http_client=CustomHTTPClient()
 )
 
-def format_articles_for_prompt(news_articles):
-    """Format articles for the prompt"""
-    articles_json = []
-    for article in news_articles:
-        articles_json.append({
-            "id": article['id'],
-            "title": article['title'],
-            "content": article['content']
-        })
-    return json.dumps(articles_json, indent=2)
-
-def generate_summary_with_openai(news_articles):
-    """Generate a summary of news articles using OpenAI API"""
-    if not news_articles:
-        return None
-    
-    # Format articles for the prompt
-    formatted_articles = format_articles_for_prompt(news_articles)
-    
-    # Prepare the prompt
-    prompt = """You are an AI assistant tasked with summarizing a set of news content provided by the user. The set may contain some irrelevant articles or content that does not align with the majority theme. Your job is to:
+# Summarization instructions, identical for every request
+SUMMARY_SYSTEM_PROMPT = """You are an AI assistant tasked with summarizing a set of news content provided by the user. The set may contain some irrelevant articles or content that does not align with the majority theme. Your job is to:
 
 1. Identify and use only the news content that represents the majority and is thematically similar, ignoring irrelevant or outlier content.
 2. Generate a concise summary based on the relevant content.
@@ -97,21 +86,41 @@ Return the output in the following JSON format:
 - If the news content is insufficient or unclear, include a note in the summary field indicating the issue, but still adhere to the JSON format.
 - If no references can be confidently tied to specific articles, include an empty `refs` array and note the issue in the summary.
 
-Please process the provided news content, given in the specified input format, and return the summarized output in the specified JSON format.
+Please process the provided news content, given in the specified input format, and return the summarized output in the specified JSON format."""
+
+def format_articles_for_prompt(news_articles):
+    """Format articles for the prompt"""
+    articles_json = []
+    for article in news_articles:
+        articles_json.append({
+            "id": article['id'],
+            "title": article['title'],
+            "content": article['content']
+        })
+    # Compact output: indentation only adds prompt tokens
+    return orjson.dumps(articles_json).decode()
 
-Here are the news articles to summarize:
+def build_summary_messages(news_articles):
+    """Build the chat messages asking the model to summarize news articles"""
+    # Format articles for the prompt
+    formatted_articles = format_articles_for_prompt(news_articles)
+    
+    return [
+        # Static instructions first so repeated calls share a cacheable prefix
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": "Here are the news articles to summarize:\n\n" + formatted_articles}
+    ]
 
-"""
-    prompt += formatted_articles
+def generate_summary_with_openai(news_articles):
+    """Generate a summary of news articles using OpenAI API"""
+    if not news_articles:
+        return None
     
     try:
         # Call OpenAI API
         response = client.chat.completions.create(
             model="gpt-4-turbo",  # Use an appropriate model
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes news articles."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_summary_messages(news_articles),
             response_format={"type": "json_object"}  # Ensure JSON response
         )
         
@@ -124,54 +133,83 @@ Here are the news articles to summarize:
         print(f"Error generating summary: {str(e)}")
         return None
 
+async def generate_summary_with_openai_async(aclient, news_articles):
+    """Generate a summary of news articles using the async OpenAI client"""
+    if not news_articles:
+        return None
+    
+    try:
+        response = await aclient.chat.completions.create(
+            model="gpt-4-turbo",
+            messages=build_summary_messages(news_articles),
+            response_format={"type": "json_object"}
+        )
+        return json.loads(response.choices[0].message.content)
+    except Exception as e:
+        print(f"Error generating summary: {str(e)}")
+        return None
+
+async def _summarize_many(article_groups):
+    # The async client is bound to the running event loop, so it lives per call
+    async with AsyncOpenAI(
+        api_key=os.getenv('OPENAI_API_KEY'),
+        http_client=CustomAsyncHTTPClient()
+    ) as aclient:
+        return await asyncio.gather(*[
+            generate_summary_with_openai_async(aclient, news_articles)
+            for news_articles in article_groups
+        ])
+
+def summarize_many(article_groups):
+    """
+    Generate summaries for several groups of news articles concurrently
+    
+    Parameters:
+    - article_groups: List of article lists, each as passed to generate_summary_with_openai
+    
+    Returns:
+    - List of summary data (None where generation failed), in the same order
+    """
+    return asyncio.run(_summarize_many(article_groups))
+
 def save_summary_to_db(summary_data, article_ids):
     """Save summary data to the database"""
     if not summary_data:
         return None
     
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Convert tldr list to array format for PostgreSQL
-        tldr_array = "{" + ",".join(f'"{item}"' for item in summary_data["tldr"]) + "}"
-        
-        # Convert article IDs to array format
-        article_ids_array = "{" + ",".join(str(id) for id in article_ids) + "}"
-        
-        # Extract sentences from refs and convert to PostgreSQL array format
+        # Extract sentences from refs; psycopg2 adapts the lists to PostgreSQL arrays
         refs_sentences = []
         if "refs" in summary_data and summary_data["refs"]:
             for ref in summary_data["refs"]:
                 if isinstance(ref, dict) and "sentence" in ref:
                     refs_sentences.append(ref["sentence"])
         
-        # Format refs as PostgreSQL array
-        refs_array = "{" + ",".join(f'"{sentence}"' for sentence in refs_sentences) + "}"
-        
         # Create embedding for the summary text
         summary_text = summary_data["title"] + " " + summary_data["summary"]
         embedding = create_simple_embedding(summary_text)
         
-        # Insert into database
-        cur.execute("""
-            INSERT INTO summaries (title, tldr, summary, news_articles_ids, refs, embedding)
-            VALUES (%s, %s, %s, %s, %s, %s::vector)
-            RETURNING id
-        """, (
-            summary_data["title"],
-            tldr_array,
-            summary_data["summary"],
-            article_ids_array,
-            refs_array,
-            embedding
-        ))
-        
-        summary_id = cur.fetchone()[0]
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_conn() as conn:
+            cur = conn.cursor()
+        
+            # Insert into database
+            cur.execute("""
+                INSERT INTO summaries (title, tldr, summary, news_articles_ids, refs, embedding)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING id
+            """, (
+                summary_data["title"],
+                list(summary_data["tldr"]),
+                summary_data["summary"],
+                list(map(int, article_ids)),
+                refs_sentences,
+                embedding
+            ))
+        
+            summary_id = cur.fetchone()['id']
+        
+            conn.commit()
+            cur.close()
         
         return summary_id
     except Exception as e:
@@ -193,29 +231,21 @@ def summarize_news_articles(article_ids):
     
     try:
         # Get the articles from the database
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Convert article IDs to string format for SQL IN clause
-        ids_str = ",".join(str(id) for id in article_ids)
-        
-        # Get articles
-        cur.execute(f"""
-            SELECT id, title, content
-            FROM news_articles
-            WHERE id IN ({ids_str})
-        """)
-        
-        articles = []
-        for row in cur.fetchall():
-            articles.append({
-                "id": row[0],
-                "title": row[1],
-                "content": row[2]
-            })
-        
-        cur.close()
-        conn.close()
+        with db_conn() as conn:
+            cur = conn.cursor()
+        
+            # Get articles, with the IDs bound as a single array parameter
+            execute_prepared(cur, 'get_articles_by_ids', (list(map(int, article_ids)),))
+        
+            articles = []
+            for row in cur.fetchall():
+                articles.append({
+                    "id": row['id'],
+                    "title": row['title'],
+                    "content": row['content']
+                })
+        
+            cur.close()
         
         if not articles:
             return {"error": "No articles found with the provided IDs"}
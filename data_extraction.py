@@ -1,27 +1,178 @@
 import pandas as pd
-import xml.etree.ElementTree as ET
+from lxml import etree, html
+from io import BytesIO
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import time
+import threading
 import re
 import os
 import logging
-import feedparser
-from urllib.parse import urljoin
+import json
+from urllib.parse import urljoin, urlsplit
 from abc import ABC, abstractmethod
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Format of the pub_date_formatted column
+PUB_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Low-cardinality columns stored as pandas categoricals while merging archives
+_CATEGORY_COLUMNS = ('source', 'category', 'subcategory')
+
+def _with_category_dtypes(df):
+    """Convert the repetitive label columns to categoricals, so sorts compare integer codes"""
+    return df.astype({col: 'category' for col in _CATEGORY_COLUMNS if col in df.columns})
+
+# HTML entities replaced by _clean_text, with their plain-text forms
+_ENTITY_REPLACEMENTS = {
+    '&#8216;': "'",
+    '&#8217;': "'",
+    '&#8220;': '"',
+    '&#8221;': '"',
+    '&amp;': '&',
+    '&nbsp;': ' ',
+    '&#8211;': '-',
+    '&#8212;': '—',
+    '&#8230;': '...',
+}
+_ENTITY_RE = re.compile('|'.join(map(re.escape, _ENTITY_REPLACEMENTS)))
+_LINK_RE = re.compile(r'<a[^>]*>(.*?)</a>')
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Typographic characters (as decoded by an HTML parser) mapped to the same
+# plain forms _clean_text uses for their HTML entities
+_PUNCTUATION_TRANSLATION = str.maketrans({
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2013': '-',
+    '\u2026': '...',
+    '\xa0': ' ',
+})
+
+# Clark-notation tag of the Media RSS <media:content> element
+_MEDIA_CONTENT_TAG = '{http://search.yahoo.com/mrss/}content'
+
+def _replace_entity(match):
+    return _ENTITY_REPLACEMENTS[match.group(0)]
+
+def _clean_text_series(series):
+    """
+    Vectorized HKFPCrawler._clean_text over a whole column. Non-string cells
+    are returned unchanged, as _clean_text does.
+    """
+    if not pd.api.types.is_object_dtype(series) and not pd.api.types.is_string_dtype(series):
+        return series
+    cleaned = (
+        series.str.replace(_ENTITY_RE, _replace_entity, regex=True)
+        .str.translate(_PUNCTUATION_TRANSLATION)
+        .str.replace(_LINK_RE, r'\1', regex=True)
+        .str.replace(_TAG_RE, '', regex=True)
+        .str.split()
+        .str.join(' ')
+    )
+    # The str accessor yields NA for non-string cells, keep the original there
+    return series.where(cleaned.isna(), cleaned)
+
+def _class_xpath(tag, class_name):
+    """XPath matching elements of a tag whose class list contains class_name"""
+    return f'//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+def is_english(texts, sample=2048):
+    """
+    Boolean mask of texts that are more than 70% ASCII characters. Encoding
+    with errors='ignore' drops the non-ASCII characters in C, so the ratio is
+    computed without a Python-level loop over characters. Only the first
+    sample characters are checked, which is plenty to tell the language of
+    a long article.
+    """
+    texts = texts.astype(str).str.slice(0, sample)
+    ascii_counts = texts.str.encode('ascii', 'ignore').str.len()
+    return (ascii_counts / texts.str.len()).gt(0.7)
+
+def _format_rss_dates(pub_dates):
+    """
+    Format RSS pubDate strings like "Thu, 01 May 2025 17:15:07 +0800" as
+    PUB_DATE_FORMAT in their own local time, keeping the original where
+    parsing fails
+    """
+    # Drop the UTC offset so the wall-clock time is kept as published
+    local = pub_dates.astype('string').str.rsplit(' ', n=1).str[0]
+    parsed = pd.to_datetime(local, format='%a, %d %b %Y %H:%M:%S', errors='coerce', cache=True)
+    return _formatted_or_original(parsed, pub_dates)
+
+def _format_hkfp_dates(pub_dates):
+    """
+    Format HKFP dates like "17:54, 29 April 2025" as PUB_DATE_FORMAT,
+    keeping the original where parsing fails
+    """
+    # Split the dates into their time and date parts
+    parts = pub_dates.astype('string').str.extract(r'^([^,]*), ([^,]*)')
+    parsed = pd.to_datetime(parts[1] + ' ' + parts[0], format='%d %B %Y %H:%M', errors='coerce', cache=True)
+    return _formatted_or_original(parsed, pub_dates)
+
+def _formatted_or_original(parsed, pub_dates):
+    """Format parsed dates, falling back to the original string where they are NaT"""
+    failed = parsed.isna() & pub_dates.notna() & pub_dates.astype(bool)
+    if failed.any():
+        logging.warning(f"Date parsing error for {failed.sum()} dates, keeping them as-is")
+    return parsed.dt.strftime(PUB_DATE_FORMAT).astype(object).where(parsed.notna(), pub_dates)
+
+# Request headers sent by every crawler
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def _make_session():
+    """Create the HTTP session with connection pooling and retries"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # Retry transient failures on the pooled connection instead of failing the article
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# One session for all crawler instances, so a crawler created later (such as
+# the one in update_scmp_content) reuses the connections main() warmed up
+_SESSION = _make_session()
+
 class NewsCrawlerBase(ABC):
     """Base class for news crawlers"""
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        self.headers = HEADERS
         self.output_dir = os.path.abspath('backend/hk_news')
         os.makedirs(self.output_dir, exist_ok=True)
+        # Number of pages fetched concurrently
+        self.max_workers = 8
+        # Concurrent requests allowed against any one host
+        self.max_per_host = 4
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        # Minimum seconds between the starts of two requests to one host
+        self.min_host_interval = 0.5
+        self._host_next_request = {}
+        self._host_next_request_lock = threading.Lock()
+        # Shared session keeps TCP/TLS connections alive between requests
+        self.session = _SESSION
+        # ETag/Last-Modified validators and fetch times of previous feeds, by URL
+        self.feed_cache_path = os.path.join(self.output_dir, 'feed_cache.json')
+        self.feed_cache = self._load_feed_cache()
+        # Validators of feeds fetched this run, moved into feed_cache by
+        # _mark_feed_parsed once the feed parses
+        self._fetched_feeds = {}
+        # URLs whose feed_cache entry changed this run, the only ones saved
+        self._updated_feeds = set()
+        # Feeds fetched this many seconds ago or less are not requested again
+        self.feed_ttl = 300
 
     @abstractmethod
     def parse_feed(self):
@@ -31,6 +182,140 @@ class NewsCrawlerBase(ABC):
     def extract_article_content(self, url):
         pass
 
+    def _host_slot(self, url):
+        """Semaphore bounding concurrent requests to the URL's host"""
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+
+    def _wait_for_host(self, url):
+        """
+        Space out requests to the URL's host by min_host_interval. Requests to
+        other hosts are not held up, so unrelated crawls proceed in parallel.
+        """
+        host = urlsplit(url).netloc
+        with self._host_next_request_lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_request.get(host, now))
+            self._host_next_request[host] = start + self.min_host_interval
+        # Sleep outside the lock, the reserved start time is already ours
+        if start > now:
+            time.sleep(start - now)
+
+    def _get(self, url, timeout=10, headers=None):
+        """GET a URL with the shared session, rate limited and holding one of its host's slots"""
+        self._wait_for_host(url)
+        with self._host_slot(url):
+            return self.session.get(url, timeout=timeout, headers=headers)
+
+    def _fetch(self, url, conditional=False):
+        """
+        GET a URL with the shared session and return the raw body. With
+        conditional set, None is returned without a request if the URL was
+        fetched within feed_ttl seconds; otherwise the request carries the
+        validators cached from the last fetch and None is returned if the
+        server answers 304 Not Modified.
+        """
+        headers = {}
+        if conditional:
+            cached = self.feed_cache.get(url, {})
+            if time.time() - cached.get('fetched_at', 0) < self.feed_ttl:
+                return None
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        response = self._get(url, headers=headers)
+        if conditional and response.status_code == 304:
+            self.feed_cache[url] = dict(cached, fetched_at=time.time())
+            self._updated_feeds.add(url)
+            return None
+        response.raise_for_status()
+        
+        if conditional:
+            self._fetched_feeds[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+            }
+        return response.content
+
+    def _mark_feed_parsed(self, url):
+        """
+        Keep the validators of a feed fetched this run. Only feeds that parsed
+        are kept, so one that failed is fetched in full again next run.
+        """
+        entry = self._fetched_feeds.pop(url, None)
+        if entry is not None:
+            self.feed_cache[url] = entry
+            self._updated_feeds.add(url)
+
+    def fetch_all(self, urls, conditional=False):
+        """
+        Fetch URLs concurrently, returning (content, error) pairs in the same
+        order as urls. At most one of content and error is set; both are None
+        for a conditional fetch of an unchanged URL.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch, url, conditional) for url in urls]
+            for future in futures:
+                try:
+                    results.append((future.result(), None))
+                except Exception as e:
+                    results.append((None, e))
+        return results
+
+    def _load_feed_cache(self):
+        """Load the feed validators saved by a previous run"""
+        try:
+            with open(self.feed_cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_feed_cache(self):
+        """
+        Persist the feed validators. Call this only once the parsed articles
+        are saved, or a failed run would skip their feeds next time.
+        """
+        try:
+            # Merge only this crawler's updated feeds into the file; the rest of
+            # self.feed_cache is what was loaded at start and may be stale by now
+            cache = self._load_feed_cache()
+            cache.update({url: self.feed_cache[url] for url in self._updated_feeds})
+            with open(self.feed_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving feed cache: {str(e)}")
+
+    def _iter_feed_items(self, content):
+        """Stream <item> elements from RSS XML, freeing each one once processed"""
+        items = etree.iterparse(BytesIO(content), events=('end',), tag='item', resolve_entities=False)
+        for _, item in items:
+            yield item
+            # Drop the processed item and its already-seen siblings
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+
+    def _item_fields(self, item):
+        """
+        Texts of an item's child elements by tag, read in one pass over the
+        children rather than one lookup per field. As with findtext, the first
+        child with a tag wins and empty elements give ''.
+        """
+        fields = {}
+        for child in item:
+            # Skip comments and processing instructions, whose tag is not a string
+            if isinstance(child.tag, str):
+                fields.setdefault(child.tag, child.text or '')
+        return fields
+
     def save_to_csv(self, articles, filename):
         """Save articles to CSV file"""
         try:
@@ -44,56 +329,60 @@ class NewsCrawlerBase(ABC):
         except Exception as e:
             logging.error(f"Error saving to CSV: {str(e)}")
 
-    def clean_historical_data(self, filename):
-        """Clean historical data in CSV files"""
+    def clean_historical_data(self, filename, chunksize=50_000):
+        """
+        Clean historical data in CSV files. The file is streamed through in
+        chunks of chunksize rows, so memory stays bounded as the archive grows.
+        """
         try:
             file_path = os.path.join(self.output_dir, filename)
             if not os.path.exists(file_path):
                 logging.warning(f"File {file_path} does not exist")
                 return
             
-            # Read the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Clean text columns
-            text_columns = ['title', 'description', 'full_content', 'author']
-            for col in text_columns:
-                if col in df.columns:
-                    # Apply the cleaning function to each cell in the column
-                    if 'hkfp' in filename:
-                        df[col] = df[col].apply(self._clean_text)
-
-            # Fix date formatting for hkfp
-            if 'pub_date' in df.columns and 'hkfp' in filename:
-                def fix_date(date_str):
-                    try:
-                        if isinstance(date_str, str):
-                            # Parse the date string
-                            # Split the time and date parts
-                            time_part = date_str.split(', ')[0]  # "17:54"
-                            date_part = date_str.split(', ')[1]  # "29 April 2025"
-                                
-                            # Combine them into a single datetime string
-                            datetime_str = f"{date_part} {time_part}"
-                            # Parse the combined datetime
-                            parsed_date = datetime.strptime(datetime_str, '%d %B %Y %H:%M')                            
-                            # Format the date as YYYY-MM-DD HH:MM:SS
-                            return parsed_date.strftime('%Y-%m-%d %H:%M:%S')
-                    except Exception as e:
-                        logging.warning(f"Date parsing error for {date_str}: {str(e)}")
-                    return date_str
-                
-                df['pub_date_formatted'] = df['pub_date'].apply(fix_date)
+            # Only HKFP data needs cleaning, leave the other files untouched
+            if 'hkfp' not in filename:
+                return
             
-            # Save the cleaned data
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
+            # Write the cleaned chunks to a temporary file, then swap it in
+            tmp_path = file_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as f:
+                for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize)):
+                    self._clean_chunk(chunk, filename).to_csv(f, header=(i == 0), index=False)
+            os.replace(tmp_path, file_path)
             logging.info(f"Cleaned historical data in {filename}")
             
         except Exception as e:
             logging.error(f"Error cleaning historical data in {filename}: {str(e)}")
 
+    def _clean_chunk(self, df, filename):
+        """Clean the text and date columns of one chunk of historical data"""
+        # Clean text columns
+        text_columns = ['title', 'description', 'full_content', 'author']
+        for col in text_columns:
+            if col in df.columns:
+                # Clean the whole column at once with the pandas str accessor
+                df[col] = _clean_text_series(df[col])
+
+        # Fix date formatting for hkfp
+        if 'pub_date' in df.columns:
+            df['pub_date_formatted'] = _format_hkfp_dates(df['pub_date'])
+        
+        return df
+
 class SCMPNewsCrawler(NewsCrawlerBase):
     """SCMP crawler implementation"""
+    # Article page selectors, compiled once and tried in order
+    article_content_xpath = etree.XPath(_class_xpath('div', 'article-content'))
+    content_paragraphs_xpath = etree.XPath(
+        _class_xpath('p', 'article-paragraph') + ' | ' + _class_xpath('p', 'content')
+    )
+    main_content_xpath = etree.XPath(
+        _class_xpath('div', 'main-content') + ' | ' + _class_xpath('div', 'article-body')
+    )
+    descendant_paragraphs_xpath = etree.XPath('.//p')
+    all_paragraphs_xpath = etree.XPath('//p')
+
     def __init__(self):
         super().__init__()
         # Define all SCMP RSS feed categories
@@ -129,122 +418,165 @@ class SCMPNewsCrawler(NewsCrawlerBase):
                 'golf': 'https://www.scmp.com/rss/95058/feed',
             }
         }
+        
+        # The category tree flattened once into (category, subcategory, url)
+        # tuples, so every feed can be fetched concurrently
+        self.feeds = [
+            (category, subcategory, feed_url)
+            for category, subcategories in self.feed_categories.items()
+            for subcategory, feed_url in subcategories.items()
+        ]
 
     def parse_feed(self):
         """Parse all SCMP RSS feeds"""
         all_articles = []
+        # Links already taken, as the same article can appear in several feeds
+        seen_links = set()
         
-        # Iterate through all categories and their feeds
-        for category, subcategories in self.feed_categories.items():
-            for subcategory, feed_url in subcategories.items():
-                try:
-                    logging.info(f"Parsing SCMP {category}/{subcategory} feed")
+        responses = self.fetch_all([feed_url for _, _, feed_url in self.feeds], conditional=True)
+        for (category, subcategory, feed_url), (content, error) in zip(self.feeds, responses):
+            try:
+                if error is not None:
+                    raise error
+                if content is None:
+                    logging.info(f"SCMP {category}/{subcategory} feed unchanged, skipping")
+                    continue
+                
+                logging.info(f"Parsing SCMP {category}/{subcategory} feed")
+                
+                # Process each item in the feed as it is parsed
+                for item in self._iter_feed_items(content):
+                    fields = self._item_fields(item)
+                    description = fields.get('description', '')
                     
-                    # Get the raw XML content
-                    response = requests.get(feed_url, headers=self.headers, timeout=10)
-                    response.raise_for_status()
+                    # Skip articles with missing or empty description; whitespace is
+                    # normalized for the whole batch in main()
+                    if not description or description.isspace():
+                        continue
                     
-                    # Parse XML directly
-                    root = ET.fromstring(response.content)
-                    channel = root.find('channel')
-                    if channel is None:
+                    # Skip articles already listed by an earlier feed
+                    link = fields.get('link', '')
+                    if link in seen_links:
                         continue
-                        
-                    # Process each item in the feed
-                    for item in channel.findall('item'):
-                        description = self._get_element_text(item, 'description')
-                        
-                        # Skip articles with missing or empty description
-                        if not description or description.isspace():
-                            continue
-                            
-                        # Clean description by removing newlines and multiple spaces
-                        description = ' '.join(description.split())
-                        
-                        article = {
-                            'source': 'SCMP',
-                            'category': category,
-                            'subcategory': subcategory,
-                            'title': self._get_element_text(item, 'title'),
-                            'link': self._get_element_text(item, 'link'),
-                            'description': description,
-                            'pub_date': self._get_element_text(item, 'pubDate'),
-                            'author': self._get_element_text(item, 'author'),
-                            'guid': self._get_element_text(item, 'guid'),
-                            'full_content': description,  # Using description as content
-                        }
-                        
-                        # Clean and format the published date
-                        try:
-                            if article['pub_date']:
-                                parsed_date = datetime.strptime(
-                                    article['pub_date'], 
-                                    '%a, %d %b %Y %H:%M:%S %z'
-                                )
-                                article['pub_date_formatted'] = parsed_date.strftime('%Y-%m-%d %H:%M:%S')
-                        except Exception as e:
-                            logging.warning(f"Date parsing error: {str(e)}")
-                            article['pub_date_formatted'] = article['pub_date']
-                        
-                        # Extract media content if available
-                        media_content = item.find('{http://search.yahoo.com/mrss/}content')
-                        if media_content is not None:
-                            article.update({
-                                'media_url': media_content.get('url', ''),
-                                'media_type': media_content.get('type', ''),
-                                'media_width': media_content.get('width', ''),
-                                'media_height': media_content.get('height', '')
-                            })
-                        
-                        all_articles.append(article)
+                    seen_links.add(link)
                     
-                    time.sleep(2)  # Polite delay between feed requests
-                        
-                except Exception as e:
-                    logging.error(f"Error parsing SCMP {category}/{subcategory} feed: {str(e)}")
-                    continue
+                    article = {
+                        'source': 'SCMP',
+                        'category': category,
+                        'subcategory': subcategory,
+                        'title': fields.get('title', ''),
+                        'link': link,
+                        'description': description,
+                        'pub_date': fields.get('pubDate', ''),
+                        'author': fields.get('author', ''),
+                        'guid': fields.get('guid', ''),
+                        'full_content': description,  # Using description as content
+                    }
+                    
+                    # Extract media content if available; the field pass already saw
+                    # every child tag, so text-only items skip the lookup
+                    media_content = item.find(_MEDIA_CONTENT_TAG) if _MEDIA_CONTENT_TAG in fields else None
+                    if media_content is not None:
+                        article.update({
+                            'media_url': media_content.get('url', ''),
+                            'media_type': media_content.get('type', ''),
+                            'media_width': media_content.get('width', ''),
+                            'media_height': media_content.get('height', '')
+                        })
+                    
+                    all_articles.append(article)
                 
+                self._mark_feed_parsed(feed_url)
+            except Exception as e:
+                logging.error(f"Error parsing SCMP {category}/{subcategory} feed: {str(e)}")
+                continue
+            
         return all_articles
 
-    def _get_element_text(self, item, tag):
-        """Helper method to safely get element text"""
-        element = item.find(tag)
-        return element.text if element is not None else ''
-
     def extract_article_content(self, url):
         """
-        Minimal implementation to satisfy abstract base class.
-        We're not using this since we get content directly from RSS feed.
+        Extract the article paragraphs from an SCMP article page.
+        Feed items already carry their description as content, so this is only
+        used by update_scmp_content to fill in full_paragraphs.
         """
-        return {'full_content': ''}
+        try:
+            logging.info("Fetching content from: %s", url)
+            
+            # Make request to article URL
+            response = self._get(url)
+            response.raise_for_status()
+            
+            # Parse HTML content straight into an lxml tree from the raw bytes
+            tree = html.fromstring(response.content)
+            
+            # Try different selectors to find paragraphs
+            paragraphs = []
+            
+            # Method 1: Try finding article content div first
+            article_content = self.article_content_xpath(tree)
+            if article_content:
+                paragraphs = self.descendant_paragraphs_xpath(article_content[0])
+            
+            # Method 2: Try finding paragraphs with specific classes
+            if not paragraphs:
+                paragraphs = self.content_paragraphs_xpath(tree)
+            
+            # Method 3: Try finding all paragraphs within main content area
+            if not paragraphs:
+                main_content = self.main_content_xpath(tree)
+                if main_content:
+                    paragraphs = self.descendant_paragraphs_xpath(main_content[0])
+            
+            # Method 4: Last resort - get all paragraphs
+            if not paragraphs:
+                paragraphs = self.all_paragraphs_xpath(tree)
+            
+            # Log debug information
+            logging.debug("URL: %s", url)
+            logging.debug("Number of paragraphs found: %d", len(paragraphs))
+            if paragraphs and logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("First paragraph sample: %s", paragraphs[0].text_content().strip())
+            
+            # Join all paragraphs with newlines
+            texts = (p.text_content().strip() for p in paragraphs)
+            full_content = '\n'.join(text for text in texts if text)
+            return {'full_paragraphs': full_content}
+            
+        except Exception as e:
+            logging.error(f"Error extracting content from {url}: {str(e)}")
+            return None
 
 class HKFPCrawler(NewsCrawlerBase):
     """Hong Kong Free Press crawler"""
-    def __init__(self):
+    # Text-only anchors to URLs like https://hongkongfp.com/2025/04/06/article-title
+    article_links_xpath = etree.XPath(
+        r'//a[not(*) and normalize-space(text()) and re:test(@href, "^https://hongkongfp\.com/\d{4}/\d{2}/\d{2}/.")]',
+        namespaces={'re': 'http://exslt.org/regular-expressions'}
+    )
+    # Article page fragments, compiled once rather than on every page
+    author_xpath = etree.XPath(_class_xpath('span', 'author'))
+    content_xpath = etree.XPath(_class_xpath('div', 'entry-content'))
+
+    def __init__(self, seen_links=None):
         super().__init__()
         self.base_url = 'https://hongkongfp.com'
+        # Links already saved, whose article pages need not be fetched again
+        self.seen_links = set(seen_links or ())
 
     def _clean_text(self, text):
         """Clean text by removing HTML entities and hyperlinks"""
         if not isinstance(text, str):
             return text
             
-        # Replace HTML entities with their corresponding characters
-        text = text.replace('&#8216;', "'")
-        text = text.replace('&#8217;', "'")
-        text = text.replace('&#8220;', '"')
-        text = text.replace('&#8221;', '"')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&#8211;', '-')
-        text = text.replace('&#8212;', '—')
-        text = text.replace('&#8230;', '...')
+        # Replace HTML entities with their corresponding characters in one pass
+        text = _ENTITY_RE.sub(_replace_entity, text)
+        text = text.translate(_PUNCTUATION_TRANSLATION)
         
         # Remove hyperlinks
-        text = re.sub(r'<a[^>]*>(.*?)</a>', r'\1', text)
+        text = _LINK_RE.sub(r'\1', text)
         
         # Remove any remaining HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _TAG_RE.sub('', text)
         
         # Remove extra whitespace
         text = ' '.join(text.split())
@@ -257,59 +589,52 @@ class HKFPCrawler(NewsCrawlerBase):
         
         try:
             # Get the main page
-            response = requests.get(self.base_url, headers=self.headers, timeout=10)
+            response = self._get(self.base_url)
             response.raise_for_status()
             
-            # Print first part of response to debug
-            print("Response text sample:", response.text[:1000])
+            # Log the start of the raw page to debug, without decoding it all to text
+            logging.debug("Response sample: %r", response.content[:1000])
             
-            # Find all article links
-            # Pattern matches URLs like: /2025/04/06/article-title
-            link_pattern = r'href="(https://hongkongfp\.com/\d{4}/\d{2}/\d{2}/[^"]+)"[^>]*>([^<]+)</a>'
-            article_links = re.findall(link_pattern, response.text)
+            # Find all article links, keeping the first title seen for each URL
+            tree = html.fromstring(response.content)
+            links = {}
+            for anchor in self.article_links_xpath(tree):
+                links.setdefault(anchor.get('href'), anchor.text)
             
-            print(f"Found {len(article_links)} article links")
+            # Only fetch the articles not saved by a previous run
+            article_links = [(url, title) for url, title in links.items() if url not in self.seen_links]
+            logging.info("Found %d article links, %d new", len(links), len(article_links))
             
-            for url, title in article_links:
-                try:
-                    print(f"Processing URL: {url}")
-                    print(f"Title: {title}")
-                    
-                    # Clean the title
-                    cleaned_title = self._clean_text(title)
-                    
-                    # Get article content
-                    article_content = self.extract_article_content(url)
-                    
-                    if article_content:
-                        article = {
-                            'source': 'HKFP',
-                            'title': cleaned_title,
-                            'link': url,
-                            'pub_date': article_content.get('pub_date', ''),
-                            'full_content': article_content.get('full_content', ''),
-                            'author': article_content.get('author', '')
-                        }
-                        
-                        # Format the date if available
-                        if article['pub_date']:
-                            try:
-                                # HKFP date format: "08:48, 6 April 2025"
-                                date_str = article['pub_date'].split(', ')[1]
-                                parsed_date = datetime.strptime(date_str, '%d %B %Y')
-                                article['pub_date_formatted'] = parsed_date.strftime('%Y-%m-%d')
-                            except Exception as e:
-                                logging.warning(f"Date parsing error: {str(e)}")
-                                article['pub_date_formatted'] = article['pub_date']
-                        
-                        all_articles.append(article)
-                        logging.info(f"Processed article: {cleaned_title}")
+            # Fetch article pages concurrently, the requests are network-bound
+            urls = [url for url, _ in article_links]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                article_contents = executor.map(self.extract_article_content, urls)
+                
+                for (url, title), article_content in zip(article_links, article_contents):
+                    try:
+                        # Per-article records are formatted only if DEBUG is enabled
+                        logging.debug("Processing URL: %s", url)
+                        logging.debug("Title: %s", title)
                         
-                        time.sleep(2)  # Polite delay between requests
+                        # Clean the title
+                        cleaned_title = self._clean_text(title)
                         
-                except Exception as e:
-                    logging.error(f"Error processing article {url}: {str(e)}")
-                    continue
+                        if article_content:
+                            article = {
+                                'source': 'HKFP',
+                                'title': cleaned_title,
+                                'link': url,
+                                'pub_date': article_content.get('pub_date', ''),
+                                'full_content': article_content.get('full_content', ''),
+                                'author': article_content.get('author', '')
+                            }
+                            
+                            all_articles.append(article)
+                            logging.info("Processed article: %s", cleaned_title)
+                            
+                    except Exception as e:
+                        logging.error(f"Error processing article {url}: {str(e)}")
+                        continue
                 
         except Exception as e:
             logging.error(f"Error parsing HKFP feed: {str(e)}")
@@ -319,34 +644,32 @@ class HKFPCrawler(NewsCrawlerBase):
     def extract_article_content(self, url):
         """Extract content from HKFP article pages"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._get(url)
             response.raise_for_status()
             
-            # Clean the HTML content
-            cleaned_text = re.sub(r'<script.*?</script>', '', response.text, flags=re.DOTALL)
-            cleaned_text = re.sub(r'<style.*?</style>', '', cleaned_text, flags=re.DOTALL)
-            
-            # Parse the cleaned HTML
-            soup = BeautifulSoup(cleaned_text, 'html.parser')
+            # Parse the raw bytes with lxml, letting it detect the encoding
+            tree = html.fromstring(response.content)
             
             # Extract article content
             article_content = {}
             
             # Get publication date
-            date_element = soup.find('time')
-            if date_element:
-                article_content['pub_date'] = date_element.get_text(strip=True)
+            date_element = tree.find('.//time')
+            if date_element is not None:
+                article_content['pub_date'] = date_element.text_content().strip()
             
             # Get author
-            author_element = soup.find('span', class_='author')
-            if author_element:
-                article_content['author'] = author_element.get_text(strip=True)
+            author_elements = self.author_xpath(tree)
+            if author_elements:
+                article_content['author'] = author_elements[0].text_content().strip()
             
             # Get main content
-            content_element = soup.find('div', class_='entry-content')
-            if content_element:
+            content_elements = self.content_xpath(tree)
+            if content_elements:
+                # Only the article body needs its scripts and styles removed
+                etree.strip_elements(content_elements[0], 'script', 'style', with_tail=False)
                 # Clean the content text
-                content_text = self._clean_text(str(content_element))
+                content_text = self._clean_text(content_elements[0].text_content())
                 article_content['full_content'] = content_text
             
             return article_content
@@ -370,83 +693,66 @@ class RTHKCrawler(NewsCrawlerBase):
     def parse_feed(self):
         """Parse all RTHK English RSS feeds"""
         all_articles = []
+        # Links already taken, as the same article can appear in several feeds
+        seen_links = set()
         
-        for category, feed_url in self.feed_categories.items():
+        # Fetch every feed concurrently, then parse them in order
+        responses = self.fetch_all(list(self.feed_categories.values()), conditional=True)
+        for (category, feed_url), (content, error) in zip(self.feed_categories.items(), responses):
             try:
-                logging.info(f"Parsing RTHK {category} feed")
-                
-                # Get the raw XML content
-                response = requests.get(feed_url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                # Parse XML directly
-                root = ET.fromstring(response.content)
-                channel = root.find('channel')
-                if channel is None:
+                if error is not None:
+                    raise error
+                if content is None:
+                    logging.info(f"RTHK {category} feed unchanged, skipping")
                     continue
                 
-                # Process each item in the feed
-                for item in channel.findall('item'):
+                logging.info(f"Parsing RTHK {category} feed")
+                
+                # Process each item in the feed as it is parsed
+                for item in self._iter_feed_items(content):
                     try:
+                        fields = self._item_fields(item)
+                        
                         # Get title without hyperlink
-                        title = self._get_element_text(item, 'title')
+                        title = fields.get('title', '')
                         if '(with hyperlink)' in title:
                             title = title.replace('(with hyperlink)', '').strip()
                         
-                        # Get description and parse its content
-                        description = self._get_element_text(item, 'description')
+                        # Get description; main() joins its lines and whitespace for
+                        # the whole batch at once
+                        description = fields.get('description', '')
                         if not description or description.isspace():
                             continue
-                            
-                        # Split description into lines and clean them
-                        lines = [line.strip() for line in description.split('\n') if line.strip()]
-                        if not lines:
+                        
+                        # Skip articles already listed by an earlier feed
+                        link = fields.get('link', '')
+                        if link in seen_links:
                             continue
-                            
-                        # Join all lines with spaces to create single-line content
-                        content = ' '.join(lines)
+                        seen_links.add(link)
                         
                         article = {
                             'source': 'RTHK',
                             'category': category,
                             'title': title,
-                            'link': self._get_element_text(item, 'link'),
-                            'description': content,
-                            'pub_date': self._get_element_text(item, 'pubDate'),
-                            'full_content': content,
+                            'link': link,
+                            'description': description,
+                            'pub_date': fields.get('pubDate', ''),
+                            'full_content': description,
                         }
                         
-                        # Clean and format the published date
-                        try:
-                            if article['pub_date']:
-                                parsed_date = datetime.strptime(
-                                    article['pub_date'], 
-                                    '%a, %d %b %Y %H:%M:%S %z'
-                                )
-                                article['pub_date_formatted'] = parsed_date.strftime('%Y-%m-%d %H:%M:%S')
-                        except Exception as e:
-                            logging.warning(f"Date parsing error: {str(e)}")
-                            article['pub_date_formatted'] = article['pub_date']
-                        
                         all_articles.append(article)
                         
                     except Exception as e:
                         logging.error(f"Error parsing article: {str(e)}")
                         continue
                 
-                time.sleep(2)  # Polite delay between feed requests
-                    
+                self._mark_feed_parsed(feed_url)
             except Exception as e:
                 logging.error(f"Error parsing RTHK {category} feed: {str(e)}")
                 continue
             
         return all_articles
 
-    def _get_element_text(self, item, tag):
-        """Helper method to safely get element text"""
-        element = item.find(tag)
-        return element.text if element is not None else ''
-
     def extract_article_content(self, url):
         """
         Minimal implementation to satisfy abstract base class.
@@ -485,41 +791,34 @@ def main():
                 if crawler:
                     crawler.clean_historical_data(f'{source.lower()}_news.csv')
                 
-                df = pd.read_csv(filename)
-                # Store URLs of existing articles
-                existing_articles[source] = set(df['link'].tolist())
+                # Store URLs of existing articles, reading only the link column
+                links = pd.read_csv(filename, usecols=['link'], dtype={'link': 'string'})['link']
+                existing_articles[source] = set(links.dropna().tolist())
                 logging.info(f"Loaded and cleaned {len(existing_articles[source])} existing {source} articles")
         
-        # Dictionary to store new articles
-        new_articles_by_source = {
-            'SCMP': [],
-            'HKFP': [],
-            'RTHK': [],
+        crawlers = {
+            'SCMP': SCMPNewsCrawler(),
+            'HKFP': HKFPCrawler(seen_links=existing_articles['HKFP']),
+            'RTHK': RTHKCrawler(),
         }
         
-        # Crawl SCMP
-        scmp_crawler = SCMPNewsCrawler()
-        scmp_articles = scmp_crawler.parse_feed()
-        for article in scmp_articles:
-            if article['link'] not in existing_articles['SCMP']:
-                new_articles_by_source['SCMP'].append(article)
-        
-        # Crawl HKFP
-        hkfp_crawler = HKFPCrawler()
-        hkfp_articles = hkfp_crawler.parse_feed()
-        for article in hkfp_articles:
-            if article['link'] not in existing_articles['HKFP']:
-                new_articles_by_source['HKFP'].append(article)
-        
-        # Crawl RTHK
-        rthk_crawler = RTHKCrawler()
-        rthk_articles = rthk_crawler.parse_feed()
-        for article in rthk_articles:
-            if article['link'] not in existing_articles['RTHK']:
-                new_articles_by_source['RTHK'].append(article)
+        # Crawl the sources concurrently, they are independent and on different hosts
+        with ThreadPoolExecutor(max_workers=len(crawlers)) as executor:
+            futures = {source: executor.submit(crawler.parse_feed) for source, crawler in crawlers.items()}
+            
+            # Dictionary to store new articles
+            new_articles_by_source = {}
+            for source, future in futures.items():
+                new_articles_by_source[source] = [
+                    article for article in future.result()
+                    if article['link'] not in existing_articles[source]
+                ]
         
-        # Process and update each source separately
+        # Process and update each source separately, writing each finished file
+        # in the background while the next source is merged
         dataframes = {}
+        writer = ThreadPoolExecutor(max_workers=1)
+        writes = []
         for source, new_articles in new_articles_by_source.items():
             filename = os.path.join(output_dir, f'{source.lower()}_news.csv')
             
@@ -529,49 +828,54 @@ def main():
                 # Create DataFrame for new articles
                 new_df = pd.DataFrame(new_articles)
                 
+                # Format the published dates of the whole batch at once
+                if 'pub_date' in new_df.columns:
+                    format_dates = _format_hkfp_dates if source == 'HKFP' else _format_rss_dates
+                    new_df['pub_date_formatted'] = format_dates(new_df['pub_date'])
+                
                 # Clean text columns
                 text_columns = ['title', 'description', 'full_content', 'author']
                 for col in text_columns:
                     if col in new_df.columns:
-                        new_df[col] = new_df[col].astype(str).str.split().str.join(' ')
+                        # Collapse whitespace runs in one regex pass instead of split + join
+                        new_df[col] = new_df[col].astype(str).str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
                 
                 # Filter for English content
-                def is_english(text):
-                    if not text:
-                        return False
-                    return len([c for c in text if ord(c) < 128]) / len(text) > 0.7
-                
-                new_df = new_df[new_df['full_content'].apply(is_english)]
+                new_df = new_df[is_english(new_df['full_content'])]
                 
                 # Add a category column for HKFP if not present
                 if source == 'HKFP':
                     new_df['category'] = 'HKFP'  # Set a default category for HKFP articles
                 
+                # new_df was already filtered against the saved links, so only
+                # duplicates within the batch (e.g. one article in two feeds) remain
+                new_df = new_df.drop_duplicates(subset='link', keep='first')
+                
                 # If file exists, append new articles
                 if os.path.exists(filename):
                     existing_df = pd.read_csv(filename)
-                    combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-                    # Remove duplicates based on link
-                    combined_df = combined_df.drop_duplicates(subset='link', keep='first')
+                    combined_df = _with_category_dtypes(pd.concat([existing_df, new_df], ignore_index=True))
                     
                     # Convert pub_date_formatted to datetime for both new and existing data
                     if 'pub_date_formatted' in combined_df.columns:
-                        combined_df['pub_date_formatted'] = pd.to_datetime(combined_df['pub_date_formatted'], errors='coerce')
+                        # Values are ISO dates or datetimes, so skip pandas' format inference
+                        combined_df['pub_date_formatted'] = pd.to_datetime(combined_df['pub_date_formatted'], format='ISO8601', errors='coerce')
                         # Sort by date (descending) and category
                         combined_df = combined_df.sort_values(by=['pub_date_formatted', 'category'], 
                                                             ascending=[False, True])
                     
-                    combined_df.to_csv(filename, index=False, encoding='utf-8-sig')
+                    writes.append(writer.submit(combined_df.to_csv, filename, index=False, encoding='utf-8-sig'))
                     dataframes[source] = combined_df
                     logging.info(f"Updated {filename} with {len(new_df)} new articles")
                 else:
                     # Create new file if it doesn't exist
+                    new_df = _with_category_dtypes(new_df)
                     if 'pub_date_formatted' in new_df.columns:
-                        new_df['pub_date_formatted'] = pd.to_datetime(new_df['pub_date_formatted'], errors='coerce')
+                        new_df['pub_date_formatted'] = pd.to_datetime(new_df['pub_date_formatted'], format='ISO8601', errors='coerce')
                         new_df = new_df.sort_values(by=['pub_date_formatted', 'category'], 
                                                   ascending=[False, True])
                     
-                    new_df.to_csv(filename, index=False, encoding='utf-8-sig')
+                    writes.append(writer.submit(new_df.to_csv, filename, index=False, encoding='utf-8-sig'))
                     dataframes[source] = new_df
                     logging.info(f"Created {filename} with {len(new_df)} articles")
             else:
@@ -581,6 +885,15 @@ def main():
                 else:
                     dataframes[source] = pd.DataFrame()
         
+        # Wait for the writes, raising any error they hit
+        writer.shutdown(wait=True)
+        for write in writes:
+            write.result()
+        
+        # The new articles are on disk, so their feeds can be skipped next run if unchanged
+        crawlers['SCMP'].save_feed_cache()
+        crawlers['RTHK'].save_feed_cache()
+        
         return dataframes
             
     except Exception as e:
@@ -594,79 +907,63 @@ def update_scmp_content():
         csv_path = os.path.join('backend/hk_news', 'scmp_news.csv')
         df = pd.read_csv(csv_path)
         
-        # Add new column for full paragraphs if it doesn't exist
-        if 'full_paragraphs' not in df.columns:
+        # Add new column for full paragraphs if it doesn't exist; a new column
+        # is saved even if no article gets updated, so later runs keep it
+        column_added = 'full_paragraphs' not in df.columns
+        if column_added:
             df['full_paragraphs'] = ''
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        crawler = SCMPNewsCrawler()
         
-        # Iterate through each article
-        for idx, row in df.iterrows():
-            try:
-                if pd.isna(df.at[idx, 'full_paragraphs']) or df.at[idx, 'full_paragraphs'] == '':
-                    url = row['link']
-                    logging.info(f"Fetching content from: {url}")
-                    
-                    # Make request to article URL
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.raise_for_status()
-                    
-                    # Parse HTML content
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Try different selectors to find paragraphs
-                    paragraphs = []
-                    
-                    # Method 1: Try finding article content div first
-                    article_content = soup.find('div', class_='article-content')
-                    if article_content:
-                        paragraphs = article_content.find_all('p')
-                    
-                    # Method 2: Try finding paragraphs with specific classes
-                    if not paragraphs:
-                        paragraphs = soup.find_all('p', class_=['article-paragraph', 'content'])
-                    
-                    # Method 3: Try finding all paragraphs within main content area
-                    if not paragraphs:
-                        main_content = soup.find('div', class_=['main-content', 'article-body'])
-                        if main_content:
-                            paragraphs = main_content.find_all('p')
-                    
-                    # Method 4: Last resort - get all paragraphs
-                    if not paragraphs:
-                        paragraphs = soup.find_all('p')
-                    
-                    # Print debug information
-                    print(f"URL: {url}")
-                    print(f"Number of paragraphs found: {len(paragraphs)}")
-                    if paragraphs:
-                        print("First paragraph sample:", paragraphs[0].get_text().strip())
-                    
-                    # Join all paragraphs with newlines
-                    full_content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+        # Articles still missing their paragraphs; object dtype so an all-NaN
+        # column read back from the CSV can hold the fetched text
+        df['full_paragraphs'] = df['full_paragraphs'].astype(object)
+        missing = df['full_paragraphs'].isna() | (df['full_paragraphs'] == '')
+        pending = df.index[missing].tolist()
+        links = df.loc[pending, 'link'].tolist()
+        
+        # Checkpoint to disk every this many updates rather than after each one
+        save_every = 100
+        updated = 0
+        # Fetched content not yet written into the DataFrame, by index
+        found = {}
+        
+        def checkpoint():
+            nonlocal column_added
+            # Assign the batch in one indexer call rather than cell by cell
+            if found:
+                df.loc[list(found), 'full_paragraphs'] = list(found.values())
+                found.clear()
+            df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+            column_added = False
+        
+        # Fetch article pages concurrently over the crawler's session
+        with ThreadPoolExecutor(max_workers=crawler.max_workers) as executor:
+            results = executor.map(crawler.extract_article_content, links)
+            
+            for idx, url, result in zip(pending, links, results):
+                try:
+                    full_content = result.get('full_paragraphs', '') if result else ''
                     
                     if full_content:
-                        # Update the DataFrame
-                        df.at[idx, 'full_paragraphs'] = full_content
+                        found[idx] = full_content
+                        updated += 1
                         
-                        # Save after each successful update
-                        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+                        # Periodic checkpoint so an interrupted run keeps most of its work
+                        if updated % save_every == 0:
+                            checkpoint()
                         
-                        logging.info(f"Updated content for article {idx + 1}/{len(df)}")
+                        logging.info("Updated content for article %d/%d", idx + 1, len(df))
                     else:
-                        logging.warning(f"No content found for article: {url}")
+                        logging.warning("No content found for article: %s", url)
                     
-                    # Polite delay between requests
-                    time.sleep(2)
-                
-            except Exception as e:
-                logging.error(f"Error processing article {row['link']}: {str(e)}")
-                continue
+                except Exception as e:
+                    logging.error(f"Error processing article {url}: {str(e)}")
+                    continue
         
-        # Final save
-        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        # Final save of anything not written since the last checkpoint
+        if found or column_added:
+            checkpoint()
         logging.info("Completed updating SCMP articles with full content")
         
     except Exception as e:
@@ -1,7 +1,9 @@
 -- Enable the pgvector extension
 CREATE EXTENSION IF NOT EXISTS vector;
 
--- Create a table for news articles with vector support
+-- Create a table for news articles with vector support. Embeddings are stored
+-- as halfvec (2 bytes per dimension), halving table, WAL and HNSW index size
+-- with negligible effect on cosine ranking
 CREATE TABLE IF NOT EXISTS news_articles (
     id SERIAL PRIMARY KEY,
     source TEXT NOT NULL,
@@ -9,13 +11,16 @@ CREATE TABLE IF NOT EXISTS news_articles (
     link TEXT UNIQUE NOT NULL,
     pub_date TIMESTAMP NOT NULL,
     content TEXT NOT NULL,
-    embedding vector(384), -- 384-dimension vector, adjust as needed
+    embedding halfvec(384), -- 384-dimension half-precision vector, adjust as needed
     is_summarized BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create an index for vector similarity search
-CREATE INDEX ON news_articles USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- Create an HNSW index for vector similarity search
+CREATE INDEX news_articles_embedding_idx ON news_articles USING hnsw (embedding halfvec_cosine_ops);
+
+-- Partial index for picking random unsummarized articles by id
+CREATE INDEX ON news_articles (id) WHERE is_summarized = FALSE;
 
 -- Create a table for news summaries
 CREATE TABLE IF NOT EXISTS summaries (
@@ -25,9 +30,10 @@ CREATE TABLE IF NOT EXISTS summaries (
     summary TEXT NOT NULL,
     news_articles_ids INTEGER[] NOT NULL,
     refs TEXT[] NOT NULL,
-    embedding vector(384),
+    embedding halfvec(384),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create an index for vector similarity search on summaries
-CREATE INDEX ON summaries USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100); 
\ No newline at end of file
+-- Create an HNSW index for vector similarity search on summaries, so
+-- ORDER BY embedding <=> ... LIMIT k is answered without a full scan
+CREATE INDEX summaries_embedding_idx ON summaries USING hnsw (embedding halfvec_cosine_ops); 
\ No newline at end of file